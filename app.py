@@ -1,23 +1,160 @@
+import json
+import os
 import pickle
+import tempfile
+import threading
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
-import numpy as np
 from io import BytesIO
 
 from src.data_handler import DataVisualizer
 from src.analytics import ProbabilityAnalyzer
+from src.approx import SampledAnalyzer, forget_refinements, refine, sample_draw, sample_fractions
+from src.background import COMPUTE_POOL, SectionJobs
+from src.cache import ANALYTICS_CACHE, CLEANING_CACHE, FIGURE_CACHE, INDEX_CACHE, SKETCH_CACHE, hash_bytes
+from src.cleaning import MISSING_STRATEGIES, handle_missing_values
+from src.column_profile import column_profile
+from src.config import CONFIG, apply_plot_style
+from src.contingency import build_contingency_index
+from src.correlation import correlation_matrix, top_correlated_pairs
+from src.dataset_registry import describe_frame
+from src.dataset_store import DATASET_STORE
+from src.event_log import LOG
+from src.sketch import build_sketches, sketch_summary
+from src.tracing import Tracer, activate, section, traced
 
+# The UI keeps its event log (dataset store spills, reloads, errors) out of the CLI's output folder.
+LOG.directory = CONFIG["UI_LOG_DIR"] or os.path.join(tempfile.gettempdir(), "visualizer-logs")
+# Refinements are keyed by (clean_key, strata, task) and clean_key starts with the store key;
+# a spilled dataset must not stay alive in a refinement still sampling it.
+DATASET_STORE.spill_hooks["refinements"] = lambda key: forget_refinements(lambda k: k[0][0] == key)
+# Contingency index builds in progress, keyed like INDEX_CACHE; shared by every session.
+_INDEX_BUILDS = {}
+_INDEX_BUILDS_LOCK = threading.Lock()
 
-def load_data(uploaded_file):
+
+def _cancel_index_builds(store_key):
+    with _INDEX_BUILDS_LOCK:
+        pending = [future for key, future in _INDEX_BUILDS.items() if key[0] == store_key]
+    # Outside the lock: cancel() runs _finish_index_build, which takes it.
+    for future in pending:
+        future.cancel()
+
+
+DATASET_STORE.spill_hooks["contingency_index"] = _cancel_index_builds
+
+
+# Rows of a sparse (large) contingency table shown on the page.
+SPARSE_PREVIEW_ROWS = 200
+
+# Config entries that change how plots are drawn, part of the figure cache key.
+PLOT_OPTION_KEYS = (
+    "LARGE_DATA_THRESHOLD",
+    "LINE_MAX_POINTS",
+    "LINE_DECIMATION",
+    "SCATTER_MODE",
+    "SCATTER_GRIDSIZE",
+    "KDE_BINNED_THRESHOLD",
+    "SKETCH_K",
+)
+
+
+@traced("load_data")
+def load_data(uploaded_file, csv_options=None):
+    """
+    Parse an upload, or take the shared frame from the dataset store when the same
+    bytes were uploaded before (by any session).
+    Returns (data, key) where key identifies the upload content and parse options.
+    """
+    csv_options = csv_options or {}
     name = uploaded_file.name.lower()
     if name.endswith(".csv"):
-        return pd.read_csv(uploaded_file)
-    if name.endswith(".pkl") or name.endswith(".pickle"):
-        return pickle.load(uploaded_file)
+        kind = "csv"
+    elif name.endswith(".pkl") or name.endswith(".pickle"):
+        kind = "pickle"
+    else:
+        return None, None
+
+    raw = uploaded_file.getvalue()
+    key = hash_bytes(raw, kind, sorted(csv_options.items()))
+
+    def parse():
+        if kind == "csv":
+            return pd.read_csv(BytesIO(raw), **csv_options)
+        return pickle.loads(raw)
+
+    return DATASET_STORE.get(key, parse), key
+
+
+def hold_dataset(key):
+    """Record this session as a holder of the stored dataset, releasing the one it held before."""
+    lease = st.session_state.get("dataset_lease")
+    if lease is not None and lease.key == key:
+        return
+    if lease is not None:
+        lease.release()
+    # Dropped with the session state when the session ends, which releases it too.
+    st.session_state["dataset_lease"] = DATASET_STORE.lease(key)
+
+
+def show_store_admin():
+    """Dataset store memory, spills and per-dataset state, for VISUALIZER_ADMIN deployments."""
+    stats = DATASET_STORE.stats()
+    with st.sidebar.expander("Dataset store (admin)"):
+        st.write(
+            f"{stats['bytes'] / 1024 / 1024:.1f} of {stats['max_bytes'] / 1024 / 1024:.0f} MB resident, "
+            f"{stats['resident']} in memory, {stats['spilled']} spilled to disk"
+        )
+        st.write(
+            f"{stats['hits']} hits, {stats['misses']} parses, {stats['spills']} spills, "
+            f"{stats['reloads']} reloads, {stats['drops']} dropped"
+        )
+        st.dataframe(DATASET_STORE.report())
+
+
+def get_sketches(df, key):
+    """Quantile sketches for the numeric columns, built once per dataset version."""
+    sketches = SKETCH_CACHE.get(key)
+    if sketches is None:
+        sketches = build_sketches(df, k=CONFIG["SKETCH_K"])
+        SKETCH_CACHE.set(key, sketches)
+    return sketches
+
+
+def get_contingency_index(df, key):
+    """
+    The pairwise contingency index for this dataset version, or None while it is still
+    being built on the compute pool; the first call per version starts the build.
+    """
+    index = INDEX_CACHE.get(key)
+    if index is not None:
+        return index
+    with _INDEX_BUILDS_LOCK:
+        if key not in _INDEX_BUILDS:
+            future = COMPUTE_POOL.submit(
+                build_contingency_index,
+                df,
+                max_cardinality=CONFIG["CONTINGENCY_MAX_CARDINALITY"],
+                memory_cap_bytes=CONFIG["CONTINGENCY_INDEX_MB"] * 1024 * 1024,
+                max_pairs=CONFIG["CONTINGENCY_MAX_PAIRS"],
+            )
+            _INDEX_BUILDS[key] = future
+            future.add_done_callback(lambda done: _finish_index_build(key, done))
     return None
 
 
+def _finish_index_build(key, future):
+    with _INDEX_BUILDS_LOCK:
+        _INDEX_BUILDS.pop(key, None)
+    if future.cancelled():
+        return
+    if future.exception() is not None:
+        LOG.error("contingency index build failed", error=repr(future.exception()))
+        return
+    INDEX_CACHE.set(key, future.result())
+
+
 def safe_name(name):
     return "".join(ch if ch.isalnum() or ch in ("_", "-") else "_" for ch in name)
 
@@ -30,10 +167,169 @@ def fig_to_png_bytes(fig):
     buf.seek(0)
     return buf
 
+def cached_plot_png(key, build_fig):
+    """
+    PNG bytes for a plot, rendered once per key and reused for display and download.
+    key should cover the dataset version, plot kind, columns and style settings.
+    """
+    png = FIGURE_CACHE.get(key)
+    if png is None:
+        fig = build_fig()
+        if fig is None:
+            return None
+        png = fig_to_png_bytes(fig).getvalue()
+        plt.close(fig)
+        FIGURE_CACHE.set(key, png)
+    return png
+
+
+
+def show_estimate(refinement, render):
+    """
+    Render the latest result of a background refinement. While it is still tightening
+    the block re-runs on its own every APPROX_POLL_SECONDS, without rerunning the page;
+    once it is final the page reruns once so the block stops polling.
+    """
+    poll = None if refinement.done else CONFIG["APPROX_POLL_SECONDS"]
+
+    @st.fragment(run_every=poll)
+    def estimate():
+        if poll is not None and refinement.done:
+            st.rerun()
+        fraction, result = refinement.latest()
+        render(result)
+        state = "final" if refinement.done else "refining in the background"
+        st.caption(
+            f"Estimated from {fraction:.1%} of rows with {CONFIG['APPROX_CONFIDENCE']:.0%} "
+            f"confidence intervals ({state})."
+        )
+
+    estimate()
+
+
+def section_jobs():
+    """This session's background work for the page sections."""
+    jobs = st.session_state.get("section_jobs")
+    if jobs is None:
+        jobs = st.session_state["section_jobs"] = SectionJobs()
+    return jobs
+
+
+def show_when_ready(future, render, message="Computing..."):
+    """
+    Render a background result at this spot of the page. Until it is ready a placeholder
+    is shown and only this block polls for it, so the rest of the page is already usable.
+    When the result arrives the page reruns once so the block stops polling.
+    """
+    poll = None if future.done() else CONFIG["BACKGROUND_POLL_SECONDS"]
+
+    @st.fragment(run_every=poll)
+    def result():
+        if future.cancelled():
+            return
+        if poll is not None and future.done():
+            st.rerun()
+        if not future.done():
+            st.info(message)
+            return
+        error = future.exception()
+        if error is not None:
+            st.error(f"Failed: {error}")
+            return
+        render(future.result())
+
+    result()
+
+
+def show_plot(jobs, slot, key, build_fig, label, file_name):
+    """Show a plot PNG from the figure cache, or render it on the render thread and show it when done."""
+    png = FIGURE_CACHE.get(key)
+    if png is not None:
+        future = jobs.ready(slot, key, png)
+    else:
+        future = jobs.submit(slot, key, lambda: cached_plot_png(key, build_fig), render=True)
+
+    def render(png):
+        if png:
+            st.image(png)
+            st.download_button(label=label, data=png, file_name=file_name, mime="image/png")
+
+    show_when_ready(future, render, "Rendering plot...")
+
+
+def show_table(table, label, file_name):
+    if table is not None:
+        if any(isinstance(dtype, pd.SparseDtype) for dtype in table.dtypes):
+            # Large contingency tables; Arrow can't take sparse columns and the dense grid is huge.
+            st.caption(f"Showing the first {min(SPARSE_PREVIEW_ROWS, len(table))} of {len(table)} rows; the CSV has them all.")
+            st.dataframe(table.head(SPARSE_PREVIEW_ROWS).sparse.to_dense())
+        else:
+            st.dataframe(table)
+        st.download_button(
+            label=f"Download {label} CSV",
+            data=table.to_csv().encode("utf-8"),
+            file_name=file_name,
+            mime="text/csv",
+        )
+
+
+def correlation_heatmap(corr, columns):
+    fig, ax = plt.subplots(figsize=(8, 6))
+    im = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1)
+    ax.set_xticks(range(len(columns)))
+    ax.set_yticks(range(len(columns)))
+    ax.set_xticklabels(columns, rotation=45, ha="right")
+    ax.set_yticklabels(columns)
+    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    ax.set_title("Correlation Heatmap")
+    return fig
+
+
+def show_profile(tracer, jobs):
+    """
+    Trace summary of this rerun plus the background sections on the page. Polls until
+    the section jobs finish, then reruns the page once so it stops polling.
+    """
+    poll = CONFIG["BACKGROUND_POLL_SECONDS"] if jobs.pending() else None
+
+    @st.fragment(run_every=poll)
+    def profile():
+        pending = jobs.pending()
+        if poll is not None and not pending:
+            st.rerun()
+        combined = Tracer()
+        combined.extend(list(tracer.events) + jobs.events())
+        st.caption(
+            "Time per traced section in this rerun and for the background sections on the page "
+            "(cached results are not re-traced). Peak memory is only tracked for sections run "
+            "in the page thread."
+        )
+        if pending:
+            st.info(f"Waiting for {pending} background section(s)...")
+        st.dataframe(combined.summary())
+        st.download_button(
+            label="Download Chrome trace JSON",
+            data=json.dumps(combined.chrome_trace()).encode("utf-8"),
+            file_name="trace.json",
+            mime="application/json",
+        )
+
+    profile()
+
+
+def show_interval_table(table, label, file_name):
+    st.dataframe(table)
+    st.download_button(
+        label=f"Download {label} CSV",
+        data=df_to_csv_bytes(table),
+        file_name=file_name,
+        mime="text/csv",
+    )
 
 
 def render_app():
     st.set_page_config(page_title="Dataset Analysis", layout="wide")
+    apply_plot_style()
     st.markdown(
         """
         <style>
@@ -90,14 +386,29 @@ def render_app():
         help="Drag and drop here",
     )
     
+    st.sidebar.header("Profiling")
+    profile_run = st.sidebar.checkbox("Profile this rerun", value=False)
+    profile_memory = st.sidebar.checkbox("Track peak memory (slower)", value=False, disabled=not profile_run)
+    # Each session profiles into its own tracer; other sessions keep theirs.
+    tracer = st.session_state.get("tracer")
+    if tracer is None:
+        tracer = st.session_state["tracer"] = Tracer()
+    activate(tracer)
+    tracer.reset()
+    if profile_run:
+        tracer.enable(memory=profile_memory)
+    else:
+        tracer.disable()
+    
     if not uploaded:
         st.info("Upload a CSV or pickle file to begin.")
         st.stop()
-    if hasattr(uploaded, "size") and uploaded.size > 50 * 1024 * 1024:
-        st.error("File too large. Please upload a file under 50 MB.")
+    max_upload_mb = CONFIG["MAX_UPLOAD_MB"]
+    if hasattr(uploaded, "size") and uploaded.size > max_upload_mb * 1024 * 1024:
+        st.error(f"File too large. Please upload a file under {max_upload_mb} MB.")
         st.stop()
     
-    data = load_data(uploaded)
+    data, data_key = load_data(uploaded)
     if data is None:
         st.error("Unsupported file type.")
         st.stop()
@@ -106,18 +417,26 @@ def render_app():
         st.stop()
     
     df = data
+    hold_dataset(data_key)
+    if os.environ.get("VISUALIZER_ADMIN"):
+        show_store_admin()
+    # Computed once per upload; the sections below read columns, dtypes and nulls from it.
+    profile = column_profile(df)
+    for cache_name, cache in (
+        ("Figure", FIGURE_CACHE),
+        ("Cleaning", CLEANING_CACHE),
+        ("Analytics", ANALYTICS_CACHE),
+    ):
+        cache_stats = cache.stats()
+        st.sidebar.caption(
+            f"{cache_name} cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['bytes'] / 1024 / 1024:.1f} MB used"
+        )
     
     st.sidebar.header("Missing Value Handling")
     missing_option = st.sidebar.selectbox(
         "Choose a missing value strategy",
-        [
-            "None",
-            "Drop rows with missing values",
-            "Fill numeric NaNs with mean",
-            "Fill numeric NaNs with median",
-            "Fill categorical NaNs with 'Unknown'",
-            "Custom fill value (single column)",
-        ],
+        MISSING_STRATEGIES,
     )
     custom_value = None
     custom_column = None
@@ -125,64 +444,98 @@ def render_app():
         custom_value = st.sidebar.text_input("Custom fill value (applies to NaNs only)", value="")
         custom_column = st.sidebar.selectbox(
             "Apply to column",
-            df.columns.tolist(),
+            profile.columns,
         )
     
-    df_clean = df.copy()
-    if missing_option == "Drop rows with missing values":
-        df_clean = df_clean.dropna()
-    elif missing_option == "Fill numeric NaNs with mean":
-        num_cols = df_clean.select_dtypes(include="number").columns
-        df_clean[num_cols] = df_clean[num_cols].fillna(df_clean[num_cols].mean())
-    elif missing_option == "Fill numeric NaNs with median":
-        num_cols = df_clean.select_dtypes(include="number").columns
-        df_clean[num_cols] = df_clean[num_cols].fillna(df_clean[num_cols].median())
-    elif missing_option == "Fill categorical NaNs with 'Unknown'":
-        cat_cols = df_clean.select_dtypes(exclude="number").columns
-        df_clean[cat_cols] = df_clean[cat_cols].fillna("Unknown")
-    elif missing_option == "Custom fill value (single column)":
-        if custom_value is not None and custom_column:
-            col = custom_column
-            if pd.api.types.is_numeric_dtype(df_clean[col]):
-                try:
-                    df_clean[col] = df_clean[col].fillna(float(custom_value))
-                except ValueError:
-                    df_clean[col] = df_clean[col].fillna(custom_value)
-            else:
-                df_clean[col] = df_clean[col].fillna(custom_value)
+    df_clean, clean_profile = handle_missing_values(df, missing_option, custom_column, custom_value)
+
+    st.sidebar.header("Approximate Analytics")
+    approx_mode = st.sidebar.checkbox(
+        "Estimate from a sample",
+        value=len(df_clean) >= CONFIG["APPROX_ROWS_THRESHOLD"],
+        help="Summary, probability tables and categorical analysis on a stratified sample "
+        "that is refined in the background.",
+    )
+    strata = []
+    if approx_mode:
+        strata = st.sidebar.multiselect(
+            "Stratify on",
+            clean_profile.other_columns,
+        )
     
     st.success(f"Loaded {df_clean.shape[0]} rows and {df_clean.shape[1]} columns.")
     st.dataframe(df_clean.head(20))
     
-    numeric_cols = df_clean.select_dtypes(include="number").columns.tolist()
-    all_cols = df_clean.columns.tolist()
+    numeric_cols = clean_profile.numeric_columns
+    all_cols = clean_profile.columns
     
     viz = DataVisualizer()
     viz.set_data(df_clean)
     analyzer = ProbabilityAnalyzer(data=df_clean)
+    clean_key = (data_key, missing_option, custom_column, custom_value)
+    style_key = (
+        CONFIG["PLOT_STYLE"],
+        CONFIG["FIG_SIZE"],
+        tuple(sorted((k, CONFIG[k]) for k in PLOT_OPTION_KEYS)),
+        tuple(sorted(viz.config.items())),
+    )
+    sketches = None
+    if len(df_clean) > CONFIG["LARGE_DATA_THRESHOLD"]:
+        # Box/violin plots and summary quartiles come from sketches on large data.
+        sketches = get_sketches(df_clean, clean_key)
+        viz.set_sketches(sketches)
+    approx_fractions = sample_fractions(len(df_clean))
+
+    def approx_refinement(task, compute):
+        # Keyed by dataset version and strata so every rerun polls the same refinement.
+        return refine(
+            (clean_key, tuple(strata), task),
+            lambda fraction: compute(SampledAnalyzer(sample_draw(df_clean, strata, fraction))),
+            approx_fractions,
+        )
+
+    contingency_index = None
+    if CONFIG["CONTINGENCY_INDEX"] and not approx_mode:
+        # Until the background build finishes, tables come from the memo cache.
+        contingency_index = get_contingency_index(df_clean, clean_key)
+        if contingency_index is not None:
+            analyzer.set_index(contingency_index)
     
+    jobs = section_jobs()
+
     st.markdown('<a id="summary"></a>', unsafe_allow_html=True)
     st.header("Summary")
     st.markdown('<div class="section-box">', unsafe_allow_html=True)
-    summary_df = df_clean.describe()
-    st.dataframe(summary_df)
-    st.download_button(
-        label="Download summary CSV",
-        data=df_to_csv_bytes(summary_df),
-        file_name="summary.csv",
-        mime="text/csv",
-    )
+    if approx_mode:
+        show_estimate(
+            approx_refinement("summary", lambda sampled: sampled.summary()),
+            lambda table: show_interval_table(table, "summary", "summary_estimate.csv"),
+        )
+    else:
+        if sketches:
+            summary_df = sketch_summary(sketches)
+            st.caption("Quartiles are approximate (quantile sketch).")
+        else:
+            summary_df = describe_frame(df_clean)
+        st.dataframe(summary_df)
+        st.download_button(
+            label="Download summary CSV",
+            data=df_to_csv_bytes(summary_df),
+            file_name="summary.csv",
+            mime="text/csv",
+        )
     st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown('<a id="missing-values"></a>', unsafe_allow_html=True)
     st.header("Missing Values")
     st.markdown('<div class="section-box">', unsafe_allow_html=True)
-    missing_before = df.isna().sum().to_frame("missing_count")
-    missing_after = df_clean.isna().sum().to_frame("missing_count")
     st.write("Before handling")
-    st.dataframe(missing_before[missing_before["missing_count"] > 0])
+    st.dataframe(profile.missing())
     st.write("After handling")
-    st.dataframe(missing_after[missing_after["missing_count"] > 0])
+    st.dataframe(clean_profile.missing())
+    with st.expander("Column profile"):
+        st.caption("Distinct counts above the sketch size are estimates.")
+        st.dataframe(clean_profile.table)
     st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown('<a id="plots"></a>', unsafe_allow_html=True)
@@ -191,77 +544,53 @@ def render_app():
     if not numeric_cols:
         st.warning("No numeric columns found for plots.")
     else:
+        # Rendered on the background render thread; each plot appears when it is ready.
         show_hist = st.checkbox("Show histogram")
         if show_hist:
             hist_col = st.selectbox("Histogram column", numeric_cols, key="hist_col")
-            save_path = None
-            fig = viz.plot_histogram(hist_col, show=False, save_path=save_path)
-            if fig:
-                st.pyplot(fig)
-                st.download_button(
-                    label="Download histogram PNG",
-                    data=fig_to_png_bytes(fig),
-                    file_name=f"histogram_{safe_name(hist_col)}.png",
-                    mime="image/png",
-                )
+            show_plot(
+                jobs, "histogram", (clean_key, "histogram", hist_col, style_key),
+                lambda: viz.plot_histogram(hist_col, show=False),
+                "Download histogram PNG", f"histogram_{safe_name(hist_col)}.png",
+            )
     
         show_line = st.checkbox("Show line plot")
         if show_line:
             x_col = st.selectbox("Line X column", numeric_cols, key="line_x")
             y_col = st.selectbox("Line Y column", numeric_cols, key="line_y")
-            save_path = None
-            fig = viz.plot_line(x_col, y_col, show=False, save_path=save_path)
-            if fig:
-                st.pyplot(fig)
-                st.download_button(
-                    label="Download line plot PNG",
-                    data=fig_to_png_bytes(fig),
-                    file_name=f"line_{safe_name(x_col)}_{safe_name(y_col)}.png",
-                    mime="image/png",
-                )
+            show_plot(
+                jobs, "line", (clean_key, "line", x_col, y_col, style_key),
+                lambda: viz.plot_line(x_col, y_col, show=False),
+                "Download line plot PNG", f"line_{safe_name(x_col)}_{safe_name(y_col)}.png",
+            )
     
         show_violin = st.checkbox("Show violin plot")
         if show_violin:
             violin_col = st.selectbox("Violin column", numeric_cols, key="violin_col")
-            save_path = None
-            fig = viz.plot_violin(violin_col, show=False, save_path=save_path)
-            if fig:
-                st.pyplot(fig)
-                st.download_button(
-                    label="Download violin plot PNG",
-                    data=fig_to_png_bytes(fig),
-                    file_name=f"violin_{safe_name(violin_col)}.png",
-                    mime="image/png",
-                )
+            show_plot(
+                jobs, "violin", (clean_key, "violin", violin_col, style_key),
+                lambda: viz.plot_violin(violin_col, show=False),
+                "Download violin plot PNG", f"violin_{safe_name(violin_col)}.png",
+            )
     
         show_box = st.checkbox("Show box plot")
         if show_box:
             box_col = st.selectbox("Box column", numeric_cols, key="box_col")
-            save_path = None
-            fig = viz.plot_box(box_col, show=False, save_path=save_path)
-            if fig:
-                st.pyplot(fig)
-                st.download_button(
-                    label="Download box plot PNG",
-                    data=fig_to_png_bytes(fig),
-                    file_name=f"box_{safe_name(box_col)}.png",
-                    mime="image/png",
-                )
+            show_plot(
+                jobs, "box", (clean_key, "box", box_col, style_key),
+                lambda: viz.plot_box(box_col, show=False),
+                "Download box plot PNG", f"box_{safe_name(box_col)}.png",
+            )
     
         show_scatter = st.checkbox("Show scatter plot")
         if show_scatter:
             scatter_x = st.selectbox("Scatter X column", numeric_cols, key="scatter_x")
             scatter_y = st.selectbox("Scatter Y column", numeric_cols, key="scatter_y")
-            save_path = None
-            fig = viz.plot_scatter(scatter_x, scatter_y, show=False, save_path=save_path)
-            if fig:
-                st.pyplot(fig)
-                st.download_button(
-                    label="Download scatter plot PNG",
-                    data=fig_to_png_bytes(fig),
-                    file_name=f"scatter_{safe_name(scatter_x)}_{safe_name(scatter_y)}.png",
-                    mime="image/png",
-                )
+            show_plot(
+                jobs, "scatter", (clean_key, "scatter", scatter_x, scatter_y, style_key),
+                lambda: viz.plot_scatter(scatter_x, scatter_y, show=False),
+                "Download scatter plot PNG", f"scatter_{safe_name(scatter_x)}_{safe_name(scatter_y)}.png",
+            )
     st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown('<a id="probability-tables"></a>', unsafe_allow_html=True)
@@ -272,42 +601,62 @@ def render_app():
     else:
         col1 = st.selectbox("Column 1", all_cols, key="prob_col1")
         col2 = st.selectbox("Column 2", all_cols, key="prob_col2")
+        if CONFIG["CONTINGENCY_INDEX"] and not approx_mode and contingency_index is None:
+            st.caption("Precomputing probability tables in the background.")
+        if contingency_index is not None:
+            report = contingency_index.report()
+            with st.expander("Precomputed tables"):
+                st.write(
+                    f"{report['pairs']} column pairs indexed, "
+                    f"{report['bytes'] / 1024:.1f} KB"
+                )
+                st.dataframe(pd.Series(report["columns"], name="distinct_values"))
+                if report["skipped_pairs"]:
+                    st.write("Skipped (memory cap):", report["skipped_pairs"])
+                if report["truncated"]:
+                    st.write(f"Stopped at {CONFIG['CONTINGENCY_MAX_PAIRS']} pairs; other pairs are computed on request.")
     
         show_joint = st.checkbox("Show joint counts")
-        if show_joint:
-            joint = analyzer.joint_counts(col1, col2, export=False)
-            if joint is not None:
-                st.dataframe(joint)
-                st.download_button(
-                    label="Download joint counts CSV",
-                    data=joint.to_csv().encode("utf-8"),
-                    file_name="joint_counts.csv",
-                    mime="text/csv",
-                )
+        if show_joint and approx_mode:
+            show_estimate(
+                approx_refinement(("joint_counts", col1, col2), lambda sampled: sampled.joint_counts(col1, col2)),
+                lambda table: show_interval_table(table, "joint counts", "joint_counts_estimate.csv"),
+            )
+        elif show_joint:
+            show_when_ready(
+                jobs.submit("joint_counts", (clean_key, col1, col2),
+                            lambda: analyzer.joint_counts(col1, col2, export=False)),
+                lambda joint: show_table(joint, "joint counts", "joint_counts.csv"),
+            )
     
         show_joint_prob = st.checkbox("Show joint probability")
-        if show_joint_prob:
-            joint_prob = analyzer.joint_probability(col1, col2, export=False)
-            if joint_prob is not None:
-                st.dataframe(joint_prob)
-                st.download_button(
-                    label="Download joint probability CSV",
-                    data=joint_prob.to_csv().encode("utf-8"),
-                    file_name="joint_probability.csv",
-                    mime="text/csv",
-                )
+        if show_joint_prob and approx_mode:
+            show_estimate(
+                approx_refinement(("joint_probability", col1, col2),
+                                  lambda sampled: sampled.joint_probability(col1, col2)),
+                lambda table: show_interval_table(table, "joint probability", "joint_probability_estimate.csv"),
+            )
+        elif show_joint_prob:
+            show_when_ready(
+                jobs.submit("joint_probability", (clean_key, col1, col2),
+                            lambda: analyzer.joint_probability(col1, col2, export=False)),
+                lambda joint_prob: show_table(joint_prob, "joint probability", "joint_probability.csv"),
+            )
     
         show_cond = st.checkbox("Show conditional probability")
-        if show_cond:
-            cond = analyzer.conditional_probability(col1, col2, export=False)
-            if cond is not None:
-                st.dataframe(cond)
-                st.download_button(
-                    label="Download conditional probability CSV",
-                    data=cond.to_csv().encode("utf-8"),
-                    file_name="conditional_probability.csv",
-                    mime="text/csv",
-                )
+        if show_cond and approx_mode:
+            show_estimate(
+                approx_refinement(("conditional_probability", col1, col2),
+                                  lambda sampled: sampled.conditional_probability(col1, col2)),
+                lambda table: show_interval_table(
+                    table, "conditional probability", "conditional_probability_estimate.csv"),
+            )
+        elif show_cond:
+            show_when_ready(
+                jobs.submit("conditional_probability", (clean_key, col1, col2),
+                            lambda: analyzer.conditional_probability(col1, col2, export=False)),
+                lambda cond: show_table(cond, "conditional probability", "conditional_probability.csv"),
+            )
     st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown('<a id="vector-operations"></a>', unsafe_allow_html=True)
@@ -324,13 +673,20 @@ def render_app():
         if show_vec:
             vec_a = df_clean[vec_col_a].values[:vec_len]
             vec_b = df_clean[vec_col_b].values[:vec_len]
-            vec_results = analyzer.vector_operations(vec_a, vec_b, export=False)
-            st.dataframe(vec_results)
-            st.download_button(
-                label="Download vector results CSV",
-                data=df_to_csv_bytes(vec_results),
-                file_name="vector_results.csv",
-                mime="text/csv",
+
+            def render_vectors(vec_results):
+                st.dataframe(vec_results)
+                st.download_button(
+                    label="Download vector results CSV",
+                    data=df_to_csv_bytes(vec_results),
+                    file_name="vector_results.csv",
+                    mime="text/csv",
+                )
+
+            show_when_ready(
+                jobs.submit("vectors", (clean_key, vec_col_a, vec_col_b, vec_len),
+                            lambda: analyzer.vector_operations(vec_a, vec_b, export=False)),
+                render_vectors,
             )
     st.markdown("</div>", unsafe_allow_html=True)
     
@@ -342,7 +698,18 @@ def render_app():
     else:
         cat_col = st.selectbox("Column", all_cols, key="cat_col")
         show_cat = st.checkbox("Run categorical analysis")
-        if show_cat:
+        if show_cat and approx_mode:
+            def render_categorical(results):
+                st.write("Unique values in the sample:", results["unique_values"])
+                st.write("2-permutations (first 5):", results["permutations_2"])
+                st.write("2-combinations (first 5):", results["combinations_2"])
+                show_interval_table(results["counts"], "value counts", "value_counts_estimate.csv")
+
+            show_estimate(
+                approx_refinement(("categorical", cat_col), lambda sampled: sampled.categorical_analysis(cat_col)),
+                render_categorical,
+            )
+        elif show_cat:
             cat_results = analyzer.categorical_analysis(cat_col, export=False)
             if cat_results:
                 st.write("Unique values:", cat_results["unique_values"])
@@ -367,27 +734,36 @@ def render_app():
     if len(numeric_cols) < 2:
         st.warning("Need at least two numeric columns for correlation analysis.")
     else:
-        corr = df_clean[numeric_cols].corr()
-        fig, ax = plt.subplots(figsize=(8, 6))
-        im = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1)
-        ax.set_xticks(range(len(numeric_cols)))
-        ax.set_yticks(range(len(numeric_cols)))
-        ax.set_xticklabels(numeric_cols, rotation=45, ha="right")
-        ax.set_yticklabels(numeric_cols)
-        fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
-        ax.set_title("Correlation Heatmap")
-        st.pyplot(fig)
-    
-        corr_pairs = corr.where(~np.eye(len(corr), dtype=bool)).stack()
-        top_corr = corr_pairs.reindex(
-            corr_pairs.abs().sort_values(ascending=False).index
-        ).head(10)
-        top_corr_df = top_corr.reset_index()
-        top_corr_df.columns = ["column_1", "column_2", "corr"]
-        top_corr_df["abs_corr"] = top_corr_df["corr"].abs()
-        st.dataframe(top_corr_df)
+        def compute_correlation():
+            with section("correlation"):
+                return correlation_matrix(df_clean, numeric_cols)
+
+        corr_key = (clean_key, "correlation", tuple(numeric_cols), style_key)
+        corr_future = jobs.submit("correlation", corr_key, compute_correlation)
+        # The heatmap is drawn on the render thread once the matrix is ready.
+        heatmap_future = jobs.submit(
+            "correlation_heatmap", corr_key,
+            lambda corr: cached_plot_png(corr_key, lambda: correlation_heatmap(corr, numeric_cols)),
+            render=True, after=corr_future,
+        )
+        show_when_ready(heatmap_future, st.image, "Rendering heatmap...")
+        show_when_ready(
+            corr_future,
+            lambda corr: st.dataframe(top_correlated_pairs(corr, k=10)),
+            "Computing correlations...",
+        )
     st.markdown("</div>", unsafe_allow_html=True)
     
+    # Work for sections that were hidden or changed in this rerun is cancelled.
+    jobs.sweep()
+
+    if tracer.enabled:
+        st.markdown('<a id="profile"></a>', unsafe_allow_html=True)
+        st.header("Profile")
+        st.markdown('<div class="section-box">', unsafe_allow_html=True)
+        show_profile(tracer, jobs)
+        st.markdown("</div>", unsafe_allow_html=True)
+    
     st.sidebar.markdown('<div class="sidebar-spacer"></div>', unsafe_allow_html=True)
     st.sidebar.subheader("Navigate")
     st.sidebar.markdown(
@@ -1,11 +1,39 @@
 #%% IMPORTS
 import pandas as pd
 import numpy as np
-import pickle
 import math
-import os
-from itertools import permutations, combinations
+from itertools import islice, permutations, combinations
 from src.config import CONFIG
+from src.cache import memoize
+from src.columnar_store import is_columnar
+from src.dataset_registry import REGISTRY
+from src.contingency import ContingencyTable, factorize_column
+from src.output_io import atomic_open, atomic_path, output_path
+from src.tracing import traced
+
+
+@memoize()
+def column_codes(data, col):
+    """Category codes and labels of one column, shared by every table that uses it."""
+    return factorize_column(data[col])
+
+
+@memoize()
+def contingency_table(data, col1, col2):
+    """ContingencyTable for a column pair of data."""
+    codes1, labels1 = column_codes(data, col1)
+    codes2, labels2 = column_codes(data, col2)
+    return ContingencyTable(codes1, labels1, codes2, labels2)
+
+
+@memoize()
+def categorical_summary(data, col):
+    """Unique values of a column and the first five 2-permutations and 2-combinations."""
+    vals = data[col].dropna().unique()
+    # islice: only five pairs are kept, so don't build all n^2 of them.
+    perms = list(islice(permutations(vals, 2), 5))
+    combs = list(islice(combinations(vals, 2), 5))
+    return vals, perms, combs
 
 
 # PARENT CLASS: VectorAnalyzer
@@ -20,31 +48,41 @@ class VectorAnalyzer:
         """Set an in-memory DataFrame for analysis."""
         self.data = data
 
-    def read_pickle(self):
-        """Read pickle file into a DataFrame."""
+    @traced(category="analysis")
+    def read_pickle(self, columns=None):
+        """
+        Read pickle file into a DataFrame.
+        Columnar datasets (see src.columnar_store) are memory-mapped and only
+        the requested columns are loaded. Loads go through the shared dataset
+        registry, so every reader of the same file gets the same frame.
+        """
         if not self.pickle_file:
             print("No pickle file provided.")
             return
         try:
-            with open(self.pickle_file, "rb") as f:
-                self.data = pickle.load(f)
-            print(f"Pickle loaded successfully. Shape: {self.data.shape}")
+            self.data = REGISTRY.load(self.pickle_file, columns=columns)
+            kind = "Columnar dataset" if is_columnar(self.pickle_file) else "Pickle"
+            print(f"{kind} loaded successfully. Shape: {self.data.shape}")
         except Exception as e:
             print(f"Error loading pickle: {e}")
             self.data = None
 
+    @traced(category="analysis")
     def show_summary(self, export=True):
         """Show and export summary statistics."""
         if isinstance(self.data, pd.DataFrame):
+            summary = REGISTRY.describe(self.data)
             print("\n=== Summary Statistics ===")
-            print(self.data.describe())
+            print(summary)
             if export:
-                os.makedirs("Output", exist_ok=True)
-                self.data.describe().to_csv("Output/pickle_summary.csv", index=False)
-                print("Summary exported to Output/pickle_summary.csv")
+                path = output_path("pickle_summary.csv")
+                with atomic_path(path) as tmp:
+                    summary.to_csv(tmp, index=False)
+                print(f"Summary exported to {path}")
         else:
             print("No valid DataFrame loaded.")
 
+    @traced(category="analysis")
     def vector_operations(self, a, b, export=True):
         """Compute basic vector operations and export results."""
         a, b = np.array(a), np.array(b)
@@ -94,9 +132,10 @@ class VectorAnalyzer:
         })
 
         if export:
-            os.makedirs("Output", exist_ok=True)
-            results.to_csv("Output/vector_results.csv", index=False)
-            print("Vector results exported to Output/vector_results.csv")
+            path = output_path("vector_results.csv")
+            with atomic_path(path) as tmp:
+                results.to_csv(tmp, index=False)
+            print(f"Vector results exported to {path}")
         return results
 
 
@@ -108,6 +147,20 @@ class ProbabilityAnalyzer(VectorAnalyzer):
         """Override parent summary to keep interface consistent for children."""
         return super().show_summary(export=export)
 
+    def set_index(self, index):
+        """Attach a ContingencyIndex built from the current data for O(1) table lookups."""
+        self._index = index
+        self._index_owner = self.data
+
+    def _contingency(self, col1, col2):
+        """Shared count matrix for a column pair, from the index or the memo cache."""
+        index = getattr(self, "_index", None)
+        if index is not None and self._index_owner is self.data:
+            table = index.get(col1, col2)
+            if table is not None:
+                return table
+        return contingency_table(self.data, col1, col2)
+
     def _validate_columns(self, *cols):
         if self.data is None:
             print("No data loaded.")
@@ -118,42 +171,46 @@ class ProbabilityAnalyzer(VectorAnalyzer):
             return False
         return True
 
+    @traced(category="analysis")
     def joint_counts(self, col1, col2, export=True):
         if self._validate_columns(col1, col2):
-            joint = pd.crosstab(self.data[col1], self.data[col2])
+            joint = self._contingency(col1, col2).counts()
             print("\n=== Joint Counts ===")
             print(joint)
             if export:
-                os.makedirs("Output", exist_ok=True)
-                joint.to_csv("Output/joint_counts.csv")
+                with atomic_path(output_path("joint_counts.csv")) as tmp:
+                    joint.to_csv(tmp)
                 print("Joint counts exported.")
             return joint
         return None
 
+    @traced(category="analysis")
     def joint_probability(self, col1, col2, export=True):
         if self._validate_columns(col1, col2):
-            joint = pd.crosstab(self.data[col1], self.data[col2]) / len(self.data)
+            joint = self._contingency(col1, col2).joint_probability()
             print("\n=== Joint Probability Table ===")
             print(joint)
             if export:
-                os.makedirs("Output", exist_ok=True)
-                joint.to_csv("Output/joint_probability.csv")
+                with atomic_path(output_path("joint_probability.csv")) as tmp:
+                    joint.to_csv(tmp)
                 print("Joint probabilities exported.")
             return joint
         return None
 
+    @traced(category="analysis")
     def conditional_probability(self, col1, col2, export=True):
         if self._validate_columns(col1, col2):
-            cond = pd.crosstab(self.data[col1], self.data[col2], normalize='columns')
+            cond = self._contingency(col1, col2).conditional_probability()
             print("\n=== Conditional Probability Table ===")
             print(cond)
             if export:
-                os.makedirs("Output", exist_ok=True)
-                cond.to_csv("Output/conditional_probability.csv")
+                with atomic_path(output_path("conditional_probability.csv")) as tmp:
+                    cond.to_csv(tmp)
                 print("Conditional probabilities exported.")
             return cond
         return None
 
+    @traced(category="analysis")
     def categorical_analysis(self, col, export=True):
         if self.data is None:
             print("No data loaded.")
@@ -161,16 +218,13 @@ class ProbabilityAnalyzer(VectorAnalyzer):
         if col not in self.data.columns:
             print(f"Column '{col}' not found.")
             return None
-        vals = self.data[col].dropna().unique()
-        perms = list(permutations(vals, 2))[:5]
-        combs = list(combinations(vals, 2))[:5]
+        vals, perms, combs = categorical_summary(self.data, col)
 
         print(f"\nUnique values in {col}: {vals}")
         print(f"2-permutations (first 5): {perms}")
         print(f"2-combinations (first 5): {combs}")
         if export:
-            os.makedirs("Output", exist_ok=True)
-            with open("Output/categorical_analysis.txt", "w") as f:
+            with atomic_open(output_path("categorical_analysis.txt")) as f:
                 f.write(f"Unique values in {col}: {vals}\n")
                 f.write(f"2-permutations: {perms}\n")
                 f.write(f"2-combinations: {combs}\n")
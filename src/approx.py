@@ -0,0 +1,409 @@
+#%% IMPORTS
+import threading
+from collections import OrderedDict
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from src.analytics import categorical_summary
+from src.cache import frame_nbytes, memoize
+from src.config import CONFIG
+from src.contingency import factorize_column
+from src.event_log import LOG
+
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+def z_score(confidence=None):
+    """Two-sided normal critical value, e.g. 1.96 for 0.95."""
+    confidence = CONFIG["APPROX_CONFIDENCE"] if confidence is None else confidence
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def sample_fractions(total_rows, steps=None):
+    """Increasing sampling fractions for the configured sample sizes (capped at all rows)."""
+    steps = CONFIG["APPROX_SAMPLE_ROWS"] if steps is None else steps
+    if total_rows <= 0:
+        return (1.0,)
+    fractions = sorted({min(1.0, rows / total_rows) for rows in steps})
+    return tuple(fractions)
+
+
+class SampleDraw:
+    """One sampling level: the sampled rows, their strata, and stratum sizes in the data and the sample."""
+
+    def __init__(self, frame, strata, sizes, taken, fraction):
+        self.frame = frame
+        self.strata = strata
+        self.sizes = sizes
+        self.taken = taken
+        self.fraction = fraction
+        self.total_rows = int(sizes.sum())
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Strata that drew no rows carry no weight (rare with min_per_stratum).
+            self.weights = np.where(taken > 0, sizes / taken, 0.0)
+            # Var(total) = sum_h N_h^2 (1 - m_h/N_h) / (m_h (m_h - 1)) * (Syy_h - Sy_h^2 / m_h)
+            self.var_factor = np.where(
+                taken > 1, sizes ** 2 * (1 - taken / sizes) / (taken * (taken - 1)), 0.0)
+
+    @property
+    def rows(self):
+        return len(self.frame)
+
+    @property
+    def nbytes(self):
+        return int(self.frame.memory_usage(index=True, deep=True).sum()
+                   + self.strata.nbytes + self.taken.nbytes + self.weights.nbytes + self.var_factor.nbytes)
+
+    @property
+    def complete(self):
+        return bool((self.taken == self.sizes).all())
+
+    def stratum_sums(self, values):
+        return np.bincount(self.strata, weights=values, minlength=len(self.sizes))
+
+    def total(self, sy, syy):
+        """Estimated population total and its variance from per-stratum sums of y and y^2."""
+        estimate = float(self.weights @ sy)
+        variance = float(self.var_factor @ (syy - sy ** 2 / np.maximum(self.taken, 1)))
+        return estimate, max(variance, 0.0)
+
+
+class StratifiedSample:
+    """
+    Nested stratified samples of a frame. Every row gets one uniform random key and a
+    sample at fraction f keeps the rows whose key is below their stratum's rate, so a
+    larger fraction always contains the smaller ones: refining only adds rows.
+    Small strata are sampled at a higher rate so each gets about min_per_stratum rows.
+    Only the per-row strata codes and keys are kept; draws take the frame as an argument
+    so a cached sample never keeps its dataset alive.
+    """
+
+    def __init__(self, data, strata=(), seed=0, min_per_stratum=None):
+        self.strata = tuple(strata)
+        self.min_per_stratum = CONFIG["APPROX_MIN_PER_STRATUM"] if min_per_stratum is None else min_per_stratum
+        if self.strata:
+            codes = data.groupby(list(self.strata), dropna=False, sort=False, observed=True).ngroup().to_numpy()
+        else:
+            codes = np.zeros(len(data), dtype=np.int64)
+        self.codes = codes.astype(np.int32)
+        self.sizes = np.bincount(self.codes, minlength=1).astype("float64")
+        self.keys = np.random.default_rng(seed).random(len(data), dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.keys.nbytes + self.sizes.nbytes
+
+    def rates(self, fraction):
+        floor = np.minimum(1.0, self.min_per_stratum / np.maximum(self.sizes, 1))
+        return np.maximum(fraction, floor)
+
+    def draw(self, data, fraction):
+        """SampleDraw of data (the frame this sample was built from) at fraction."""
+        if fraction >= 1.0:
+            frame, strata = data, self.codes
+        else:
+            rows = np.flatnonzero(self.keys < self.rates(fraction)[self.codes])
+            frame, strata = data.iloc[rows], self.codes[rows]
+        taken = np.bincount(strata, minlength=len(self.sizes)).astype("float64")
+        return SampleDraw(frame, strata, self.sizes, taken, fraction)
+
+
+@memoize()
+def stratified_sample(data, strata=(), seed=0):
+    """StratifiedSample of data, built once per dataset and strata."""
+    return StratifiedSample(data, strata, seed=seed)
+
+
+@memoize()
+def _cached_draw(data, strata, seed, fraction):
+    return stratified_sample(data, strata, seed).draw(data, fraction)
+
+
+def sample_draw(data, strata=(), fraction=1.0, seed=0):
+    """
+    SampleDraw of data at fraction, shared by every analysis of that level. Partial
+    levels are memoized (charged for their rows); the full level is data itself and
+    is built on each call so no cache entry holds the dataset.
+    """
+    strata = tuple(strata)
+    if fraction >= 1.0:
+        return stratified_sample(data, strata, seed).draw(data, fraction)
+    return _cached_draw(data, strata, seed, fraction)
+
+
+def _interval_rows(labels, estimate, variance, z, low=0.0, high=np.inf):
+    se = np.sqrt(np.maximum(variance, 0.0))
+    frame = pd.DataFrame({
+        "estimate": estimate,
+        "lower": np.clip(estimate - z * se, low, high),
+        "upper": np.clip(estimate + z * se, low, high),
+    })
+    used = set()
+    for position, (name, values) in enumerate(labels):
+        # The same column may be used twice (col1 == col2); keep the headers distinct.
+        while name in used:
+            name = f"{name} (2)"
+        used.add(name)
+        frame.insert(position, name, values)
+    return frame
+
+
+def _cell_totals(draw, codes):
+    """
+    Estimated row count and its variance for every non-empty cell of codes (-1 = skip).
+    Also returns the per-(stratum, cell) entries the counts came from.
+    """
+    valid = codes >= 0
+    n_cells = int(codes.max()) + 1 if valid.any() else 1
+    keys, counts = np.unique(draw.strata[valid].astype(np.int64) * n_cells + codes[valid], return_counts=True)
+    strata, cell = keys // n_cells, keys % n_cells
+    cells, entry_cell = np.unique(cell, return_inverse=True)
+    counts = counts.astype("float64")
+    estimate = np.bincount(entry_cell, weights=draw.weights[strata] * counts, minlength=len(cells))
+    variance = np.bincount(entry_cell, minlength=len(cells),
+                           weights=draw.var_factor[strata] * (counts - counts ** 2 / draw.taken[strata]))
+    return cells, estimate, variance, (strata, cell, entry_cell, counts)
+
+
+def approx_summary(draw, percentiles=DEFAULT_PERCENTILES, confidence=None):
+    """
+    describe() statistics of the numeric columns estimated from a sample, one row per
+    (column, statistic) with a confidence interval. Means and std use linearized
+    (ratio) variances; quantile intervals are Woodruff intervals. min/max have no
+    interval unless the sample covers every row.
+    """
+    z = z_score(confidence)
+    numeric = draw.frame.select_dtypes(include="number")
+    row_weights = draw.weights[draw.strata]
+    rows = []
+
+    def add(col, stat, estimate, variance=np.nan, lower=None, upper=None):
+        se = np.sqrt(max(variance, 0.0)) if np.isfinite(variance) else np.nan
+        if lower is None:
+            lower, upper = estimate - z * se, estimate + z * se
+        if draw.complete:
+            lower = upper = estimate
+        rows.append({"column": col, "statistic": stat, "estimate": estimate, "lower": lower, "upper": upper})
+
+    for col in numeric.columns:
+        y = numeric[col].to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~np.isnan(y)
+        present = draw.stratum_sums(valid.astype("float64"))
+        count, count_var = draw.total(present, present)
+        add(col, "count", count, count_var, lower=max(count - z * np.sqrt(count_var), 0.0),
+            upper=count + z * np.sqrt(count_var))
+        if count == 0:
+            for stat in ["mean", "std", "min"] + [f"{p * 100:g}%" for p in percentiles] + ["max"]:
+                add(col, stat, np.nan)
+            continue
+
+        mean = float(row_weights[valid] @ y[valid]) / count
+        # Ratio estimator: linearize around the mean; residuals are zero on missing rows.
+        d = np.where(valid, y - mean, 0.0)
+        _, mean_var = draw.total(draw.stratum_sums(d), draw.stratum_sums(d * d))
+        add(col, "mean", mean, mean_var / count ** 2)
+
+        if count > 1:
+            var = float(row_weights @ (d * d)) / (count - 1)
+            u = np.where(valid, d * d - var, 0.0)
+            _, var_var = draw.total(draw.stratum_sums(u), draw.stratum_sums(u * u))
+            half = z * np.sqrt(var_var) / count
+            add(col, "std", np.sqrt(var), lower=np.sqrt(max(var - half, 0.0)), upper=np.sqrt(var + half))
+        else:
+            add(col, "std", np.nan)
+
+        values = y[valid]
+        add(col, "min", values.min(), lower=np.nan, upper=np.nan)
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+        cdf = np.cumsum(row_weights[valid][order])
+        cdf /= cdf[-1]
+
+        def quantile(p):
+            return sorted_values[min(np.searchsorted(cdf, p, side="left"), len(sorted_values) - 1)]
+
+        for p in percentiles:
+            if draw.complete:
+                add(col, f"{p * 100:g}%", float(np.quantile(values, p)))
+                continue
+            estimate = quantile(p)
+            # Woodruff: interval for the CDF at the estimate, mapped back through the quantile function.
+            e = np.where(valid, (y <= estimate) - p, 0.0)
+            _, p_var = draw.total(draw.stratum_sums(e), draw.stratum_sums(e * e))
+            half = z * np.sqrt(p_var) / count
+            add(col, f"{p * 100:g}%", estimate, lower=quantile(max(p - half, 0.0)), upper=quantile(min(p + half, 1.0)))
+        add(col, "max", values.max(), lower=np.nan, upper=np.nan)
+    return pd.DataFrame(rows, columns=["column", "statistic", "estimate", "lower", "upper"])
+
+
+def _pair_codes(draw, col1, col2):
+    codes1, labels1 = factorize_column(draw.frame[col1])
+    codes2, labels2 = factorize_column(draw.frame[col2])
+    both = (codes1 >= 0) & (codes2 >= 0)
+    n2 = max(len(labels2), 1)
+    return np.where(both, codes1.astype(np.int64) * n2 + codes2, -1), labels1, labels2, n2
+
+
+def approx_joint_counts(draw, col1, col2, confidence=None):
+    """Estimated crosstab counts, one row per non-empty cell, with confidence intervals."""
+    codes, labels1, labels2, n2 = _pair_codes(draw, col1, col2)
+    cells, estimate, variance, _ = _cell_totals(draw, codes)
+    return _interval_rows([(col1, labels1.take(cells // n2)), (col2, labels2.take(cells % n2))],
+                          estimate, variance, z_score(confidence))
+
+
+def approx_joint_probability(draw, col1, col2, confidence=None):
+    """Estimated joint probabilities (counts over all rows), with confidence intervals."""
+    table = approx_joint_counts(draw, col1, col2, confidence)
+    table[["estimate", "lower", "upper"]] = (table[["estimate", "lower", "upper"]] / max(draw.total_rows, 1)).clip(upper=1.0)
+    return table
+
+
+def approx_conditional_probability(draw, col1, col2, confidence=None):
+    """
+    Estimated P(col1 | col2) per cell with confidence intervals (ratio of two estimated
+    totals, linearized variance).
+    """
+    codes, labels1, labels2, n2 = _pair_codes(draw, col1, col2)
+    cells, joint, joint_var, (strata, cell, entry_cell, counts) = _cell_totals(draw, codes)
+    b_codes = np.where(codes >= 0, codes % n2, -1)
+    b_cells, b_total, b_var, (b_strata, b_cell, _, b_counts) = _cell_totals(draw, b_codes)
+    totals = np.zeros(n2)
+    totals[b_cells] = b_total
+    variances = np.zeros(n2)
+    variances[b_cells] = b_var
+    b = cells % n2
+    ratio = joint / totals[b]
+
+    # Count of each entry's column value in its stratum, c_hb.
+    b_keys = b_strata * n2 + b_cell
+    c_hb = b_counts[np.searchsorted(b_keys, strata * n2 + cell % n2)]
+    cross = np.bincount(entry_cell, minlength=len(cells),
+                        weights=draw.var_factor[strata] * counts * (1 - c_hb / draw.taken[strata]))
+    # Var(joint - R * total_b) / total_b^2
+    variance = (joint_var - 2 * ratio * cross + ratio ** 2 * variances[b]) / totals[b] ** 2
+    return _interval_rows([(col1, labels1.take(cells // n2)), (col2, labels2.take(b))],
+                          ratio, variance, z_score(confidence), high=1.0)
+
+
+def approx_value_counts(draw, col, confidence=None):
+    """Estimated row count of every value of col seen in the sample, with confidence intervals."""
+    codes, labels = factorize_column(draw.frame[col])
+    cells, estimate, variance, _ = _cell_totals(draw, codes)
+    return _interval_rows([(col, labels.take(cells))], estimate, variance, z_score(confidence))
+
+
+class SampledAnalyzer:
+    """The ProbabilityAnalyzer tables and the summary on one sampling level, each with confidence intervals."""
+
+    def __init__(self, draw, confidence=None):
+        self.draw = draw
+        self.confidence = confidence
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        return approx_summary(self.draw, percentiles, self.confidence)
+
+    def joint_counts(self, col1, col2):
+        return approx_joint_counts(self.draw, col1, col2, self.confidence)
+
+    def joint_probability(self, col1, col2):
+        return approx_joint_probability(self.draw, col1, col2, self.confidence)
+
+    def conditional_probability(self, col1, col2):
+        return approx_conditional_probability(self.draw, col1, col2, self.confidence)
+
+    def categorical_analysis(self, col):
+        """Values seen in the sample, their first 2-permutations/combinations and estimated counts."""
+        vals, perms, combs = categorical_summary(self.draw.frame, col)
+        return {
+            "unique_values": vals,
+            "permutations_2": perms,
+            "combinations_2": combs,
+            "counts": approx_value_counts(self.draw, col, self.confidence),
+        }
+
+
+class Refinement:
+    """
+    Runs compute(fraction) for increasing fractions: the first in the caller's thread so
+    an estimate is available at once, the rest on a background thread. latest() returns
+    the tightest finished (fraction, result). Only the background thread references
+    compute, so a finished or cancelled refinement holds just its latest result.
+    """
+
+    def __init__(self, compute, fractions):
+        self.fractions = tuple(fractions)
+        self.error = None
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._latest = (self.fractions[0], compute(self.fractions[0]))
+        self._thread = None
+        if len(self.fractions) > 1:
+            self._thread = threading.Thread(target=self._run, args=(compute,), name="approx-refine", daemon=True)
+            self._thread.start()
+
+    def _run(self, compute):
+        for fraction in self.fractions[1:]:
+            if self._cancelled.is_set():
+                return
+            try:
+                result = compute(fraction)
+            except Exception as e:
+                self.error = e
+                LOG.error("refinement stopped", source="approx", fraction=fraction, error=str(e))
+                return
+            with self._lock:
+                self._latest = (fraction, result)
+
+    def latest(self):
+        with self._lock:
+            return self._latest
+
+    @property
+    def done(self):
+        return self._thread is None or not self._thread.is_alive()
+
+    @property
+    def nbytes(self):
+        return frame_nbytes(self.latest()[1])
+
+    def cancel(self):
+        self._cancelled.set()
+
+
+_REFINEMENTS = OrderedDict()
+_REFINEMENTS_LOCK = threading.Lock()
+
+
+def refine(key, compute, fractions):
+    """
+    Refinement for key, started on first request and shared by later reruns and
+    sessions. Past CONFIG['APPROX_REFINEMENTS_MB'] of results the least recently
+    requested refinements are cancelled and forgotten.
+    """
+    with _REFINEMENTS_LOCK:
+        refinement = _REFINEMENTS.get(key)
+        if refinement is not None:
+            _REFINEMENTS.move_to_end(key)
+            return refinement
+    refinement = Refinement(compute, fractions)
+    with _REFINEMENTS_LOCK:
+        existing = _REFINEMENTS.setdefault(key, refinement)
+        if existing is not refinement:
+            refinement.cancel()
+            return existing
+        budget = CONFIG["APPROX_REFINEMENTS_MB"] * 1024 * 1024
+        total = sum(r.nbytes for r in _REFINEMENTS.values())
+        while total > budget and len(_REFINEMENTS) > 1:
+            _, evicted = _REFINEMENTS.popitem(last=False)
+            evicted.cancel()
+            total -= evicted.nbytes
+    return refinement
+
+
+def forget_refinements(match):
+    """Cancel and drop the refinements whose key satisfies match(key)."""
+    with _REFINEMENTS_LOCK:
+        for key in [k for k in _REFINEMENTS if match(k)]:
+            _REFINEMENTS.pop(key).cancel()
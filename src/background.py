@@ -0,0 +1,126 @@
+#%% IMPORTS
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from src.config import CONFIG
+from src.pipeline import use_agg_backend
+from src.tracing import Tracer, activate, current_tracer
+
+# Shared by every session. Analyses run on the compute pool; anything that touches
+# pyplot runs on the single render thread, since pyplot's global state is not thread-safe.
+COMPUTE_POOL = ThreadPoolExecutor(max_workers=CONFIG["BACKGROUND_WORKERS"], thread_name_prefix="section")
+RENDER_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render", initializer=use_agg_backend)
+
+
+def completed(value):
+    """A Future that already holds value."""
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _chain(pool, source, func):
+    """Future for func(source.result()), started on pool once source finishes."""
+    future = Future()
+
+    def forward(inner):
+        if inner.cancelled():
+            future.cancel()
+        elif inner.exception() is not None:
+            future.set_exception(inner.exception())
+        else:
+            future.set_result(inner.result())
+
+    def start(done):
+        if done.cancelled():
+            future.cancel()
+            return
+        if not future.set_running_or_notify_cancel():
+            return
+        if done.exception() is not None:
+            future.set_exception(done.exception())
+            return
+        try:
+            pool.submit(func, done.result()).add_done_callback(forward)
+        except RuntimeError as e:
+            # Pool shut down (interpreter exit).
+            future.set_exception(e)
+
+    source.add_done_callback(start)
+    return future
+
+
+def _with_tracer(func, tracer):
+    """
+    func run in a fresh context that records into tracer, so a job's spans outlive the
+    rerun that submitted it and pool threads never keep a session's tracer active.
+    """
+    def run(*args):
+        activate(tracer)
+        return func(*args)
+    return lambda *args: contextvars.Context().run(run, *args)
+
+
+class SectionJobs:
+    """
+    One session's background work, one slot per page section (e.g. "histogram").
+    Submitting a different key to a slot cancels the work it replaces; resubmitting
+    the same key returns the job already running. Slots not used during a rerun are
+    cancelled by sweep(). While the submitting context's tracer is enabled each job
+    records its spans into a tracer of its own (time only: tracemalloc peaks are
+    meaningless with other threads allocating concurrently); see events().
+    """
+
+    def __init__(self):
+        self._slots = {}
+        self._used = set()
+        self._lock = threading.Lock()
+
+    def _replace(self, slot, key, make_future):
+        with self._lock:
+            self._used.add(slot)
+            current = self._slots.get(slot)
+            if current is not None and current[0] == key and not current[1].cancelled():
+                return current[1]
+            if current is not None:
+                # Superseded: drop it if it hasn't started; a running one finishes unseen.
+                current[1].cancel()
+            tracer = Tracer()
+            if current_tracer().enabled:
+                tracer.enable()
+            future = make_future(tracer)
+            self._slots[slot] = (key, future, tracer)
+            return future
+
+    def submit(self, slot, key, func, render=False, after=None):
+        """
+        Future for func() under key, run on the render thread if render else the compute
+        pool. With after (a Future), func(after.result()) runs once after is done.
+        """
+        pool = RENDER_POOL if render else COMPUTE_POOL
+        if after is not None:
+            return self._replace(slot, key, lambda tracer: _chain(pool, after, _with_tracer(func, tracer)))
+        return self._replace(slot, key, lambda tracer: pool.submit(_with_tracer(func, tracer)))
+
+    def ready(self, slot, key, value):
+        """Record an already available result (e.g. a cache hit) for slot."""
+        return self._replace(slot, key, lambda tracer: completed(value))
+
+    def sweep(self):
+        """Cancel work for sections that were not shown in the rerun that just finished."""
+        with self._lock:
+            for slot in list(self._slots):
+                if slot not in self._used:
+                    self._slots.pop(slot)[1].cancel()
+            self._used = set()
+
+    def pending(self):
+        with self._lock:
+            return sum(not future.done() for _, future, _ in self._slots.values())
+
+    def events(self):
+        """Trace events recorded by the jobs currently shown on the page."""
+        with self._lock:
+            tracers = [tracer for _, _, tracer in self._slots.values()]
+        return [event for tracer in tracers for event in list(tracer.events)]
@@ -0,0 +1,214 @@
+# Batch entry point: runs the cli_runner pipeline over many datasets.
+#
+#   python -m src.batch_runner data/regions/ --output Output/batch --jobs 4
+#   python -m src.batch_runner manifest.txt --output Output/batch
+#
+# Each dataset gets its own output tree. A fingerprint of every input is kept in
+# batch_state.json, so unchanged datasets are skipped on rerun and an interrupted
+# batch picks up where it stopped.
+
+#%% IMPORTS
+import argparse
+import fnmatch
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+from src.config import CONFIG
+from src.dataset_registry import REGISTRY
+from src.event_log import LOG
+from src.output_io import atomic_open
+from src.pipeline import use_agg_backend
+
+STATE_FILE = "batch_state.json"
+DATASET_PATTERNS = ("*.csv", "*.pkl", "*.cols")
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def find_datasets(source, patterns=DATASET_PATTERNS):
+    """
+    Dataset paths from a directory (searched recursively) or a manifest file
+    (one path per line, relative to the manifest; blank lines and # comments ignored).
+    """
+    if os.path.isdir(source):
+        found = []
+        for root, dirs, files in os.walk(source):
+            # A columnar dataset is a directory; take it whole and don't descend into it.
+            for name in sorted(dirs):
+                if any(fnmatch.fnmatch(name, p) for p in patterns):
+                    found.append(os.path.join(root, name))
+            dirs[:] = sorted(d for d in dirs if not any(fnmatch.fnmatch(d, p) for p in patterns))
+            for name in sorted(files):
+                if any(fnmatch.fnmatch(name, p) for p in patterns):
+                    found.append(os.path.join(root, name))
+        return sorted(found)
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def fingerprint(path):
+    """Content hash of a dataset file, or of every file inside a columnar directory."""
+    h = hashlib.blake2b(digest_size=20)
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [path]
+    for file in files:
+        h.update(os.path.relpath(file, path).encode("utf-8"))
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def dataset_output_dir(path, source, output_root):
+    """
+    Output tree for one dataset, mirroring its location under the batch source. The
+    file name keeps its suffix so car_data.csv and car_data.pkl get separate trees.
+    """
+    base = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(base))
+    if rel.startswith(".."):
+        rel = os.path.basename(os.path.normpath(path))
+    return os.path.join(output_root, rel)
+
+
+def load_state(output_root):
+    path = os.path.join(output_root, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as exc:
+        print(f"Could not read batch state ({exc}); starting fresh.")
+        return {}
+
+
+def save_state(output_root, state):
+    # Written after every dataset, atomically, so an interrupted batch can resume.
+    with atomic_open(os.path.join(output_root, STATE_FILE)) as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def run_dataset(path, output_dir):
+    """Run the full pipeline for one dataset; stage output goes to output_dir/run.log."""
+    # Imported here so the batch module stays cheap to import for listing/planning.
+    from src.cli_runner import run_pipeline
+
+    previous = CONFIG["OUTPUT_DIR"]
+    CONFIG["OUTPUT_DIR"] = output_dir
+    start = time.perf_counter()
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        with atomic_open(os.path.join(output_dir, "run.log")) as log, redirect_stdout(log):
+            timings = run_pipeline(path, path, jobs=1)
+            print("\n=== Stage Timings ===")
+            print(timings.to_string(index=False))
+        failed = timings.loc[timings["status"] != "ok", "stage"].tolist()
+        return {"status": "failed" if failed else "ok", "failed_stages": failed,
+                "seconds": round(time.perf_counter() - start, 4)}
+    except Exception:
+        return {"status": "failed", "error": traceback.format_exc(),
+                "seconds": round(time.perf_counter() - start, 4)}
+    finally:
+        LOG.flush()
+        CONFIG["OUTPUT_DIR"] = previous
+        # Each dataset is seen once; don't keep it loaded for the rest of the batch.
+        REGISTRY.clear()
+
+
+def run_batch(source, output_root, jobs=1, force=False, patterns=DATASET_PATTERNS):
+    """
+    Run the pipeline for every dataset in source, skipping inputs whose fingerprint
+    matches a previous successful run. Returns one row per dataset.
+    """
+    datasets = find_datasets(source, patterns)
+    os.makedirs(output_root, exist_ok=True)
+    state = load_state(output_root)
+
+    todo = []
+    rows = []
+    for path in datasets:
+        key = os.path.abspath(path)
+        output_dir = dataset_output_dir(path, source, output_root)
+        try:
+            digest = fingerprint(path)
+        except OSError as exc:
+            print(f"Cannot read {path}: {exc}")
+            rows.append({"dataset": path, "status": "unreadable", "seconds": 0.0})
+            continue
+        entry = state.get(key)
+        if (not force and entry and entry.get("fingerprint") == digest
+                and entry.get("status") == "ok" and os.path.isdir(output_dir)):
+            rows.append({"dataset": path, "status": "skipped", "seconds": 0.0})
+            continue
+        todo.append((path, key, digest, output_dir))
+
+    print(f"{len(datasets)} dataset(s) found, {len(todo)} to run, "
+          f"{len(datasets) - len(todo)} skipped or unreadable.")
+
+    def record(path, key, digest, output_dir, result):
+        state[key] = dict(result, fingerprint=digest, output_dir=output_dir,
+                          finished_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        save_state(output_root, state)
+        rows.append({"dataset": path, "status": result["status"], "seconds": result["seconds"]})
+        print(f"[{result['status']}] {path} ({result['seconds']:.2f}s) -> {output_dir}")
+
+    if jobs <= 1 or len(todo) <= 1:
+        for path, key, digest, output_dir in todo:
+            record(path, key, digest, output_dir, run_dataset(path, output_dir))
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=use_agg_backend) as pool:
+            futures = {pool.submit(run_dataset, path, output_dir): (path, key, digest, output_dir)
+                       for path, key, digest, output_dir in todo}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception:
+                    result = {"status": "failed", "error": traceback.format_exc(), "seconds": 0.0}
+                record(*futures[future], result)
+
+    order = {path: i for i, path in enumerate(datasets)}
+    return pd.DataFrame(rows, columns=["dataset", "status", "seconds"]).sort_values(
+        "dataset", key=lambda col: col.map(order)).reset_index(drop=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the analysis pipeline over many datasets.")
+    parser.add_argument("source", help="Directory of datasets or a manifest file listing them.")
+    parser.add_argument("--output", "-o", default=os.path.join(CONFIG["OUTPUT_DIR"], "batch"),
+                        help="Root folder for per-dataset output trees and the batch state file.")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Datasets processed in parallel.")
+    parser.add_argument("--pattern", action="append",
+                        help="Glob for dataset names in a directory (repeatable; default: csv, pkl, cols).")
+    parser.add_argument("--force", action="store_true", help="Rerun datasets even if unchanged.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    patterns = tuple(args.pattern) if args.pattern else DATASET_PATTERNS
+    summary = run_batch(args.source, args.output, jobs=args.jobs, force=args.force, patterns=patterns)
+    print("\n=== Batch Summary ===")
+    print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# Benchmark suite for the analyses on synthetic data of growing size.
+#
+#   python -m src.benchmark --sizes 1e3 1e4 1e5 1e6
+#   python -m src.benchmark --save-baseline        # store the current timings
+#   python -m src.benchmark --check                # exit 1 if anything got slower
+#   python -m src.benchmark --imports              # cold import times vs. budgets
+#
+# Every run appends one JSON line per (size, operation) to the history file.
+
+#%% IMPORTS
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.config import CONFIG
+from src.module_tmp import make_numpy_dataframe
+
+BENCH_DIR = os.path.join(CONFIG["APP_ROOT"], "benchmarks")
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+# Above this many rows the CSV ingest is skipped (the file alone would be many GB).
+MAX_CSV_ROWS = 10_000_000
+# A slowdown counts as a regression only past both the relative and the absolute margin.
+DEFAULT_TOLERANCE = 0.25
+MIN_DELTA_SECONDS = 0.01
+# Cold import budgets (seconds, fresh interpreter). Headless entry points must not
+# pull in the plotting stack; pandas itself is most of what remains.
+IMPORT_BUDGETS = {
+    "src.config": 0.05,
+    "src.analytics": 0.8,
+    "src.cli_runner": 0.8,
+    "src.batch_runner": 0.8,
+}
+HEAVY_MODULES = ("matplotlib", "seaborn", "streamlit")
+
+
+def make_dataset(rows, seed=0):
+    """Benchmark frame: 4 numeric columns, 2 categorical (20 and 200 labels), 2% nulls."""
+    return make_numpy_dataframe(rows, 4, random=True, categorical=2, cardinality=(20, 200),
+                                null_rate=0.02, seed=seed)
+
+
+def _render(fig):
+    # Plots are only drawn on save; the app and the CLI always save.
+    import matplotlib.pyplot as plt
+    if fig is None:
+        return
+    fig.savefig(io.BytesIO(), format="png")
+    plt.close(fig)
+
+
+def _operations(df, workdir, rows, only=None):
+    """(name, callable) for every benchmarked operation on df."""
+    from src.analytics import ProbabilityAnalyzer
+    from src.columnar_store import read_columnar, write_columnar
+    from src.correlation import correlation_matrix
+    from src.data_handler import CSVDataProcessor, DataVisualizer
+    from src.dataset_registry import REGISTRY
+    from src.summary import summary_table
+
+    csv_path = os.path.join(workdir, "bench.csv")
+    cols_path = os.path.join(workdir, "bench.cols")
+    ops = []
+    if rows <= MAX_CSV_ROWS and (not only or "ingest_csv" in only):
+        df.to_csv(csv_path, index=False)
+
+        def ingest_csv():
+            REGISTRY.clear()
+            CSVDataProcessor(csv_path)
+        ops.append(("ingest_csv", ingest_csv))
+    if not only or "ingest_columnar" in only:
+        write_columnar(df, cols_path)
+        ops.append(("ingest_columnar", lambda: read_columnar(cols_path, mmap=False)))
+
+    numeric = df.select_dtypes(include="number").columns.tolist()
+    viz = DataVisualizer()
+    viz.set_data(df)
+    ops += [
+        ("describe", lambda: df.describe()),
+        ("summary_engine", lambda: summary_table(df)),
+        ("joint_counts", lambda: ProbabilityAnalyzer(data=df).joint_counts("k0", "k1", export=False)),
+        ("joint_probability", lambda: ProbabilityAnalyzer(data=df).joint_probability("k0", "k1", export=False)),
+        ("conditional_probability",
+         lambda: ProbabilityAnalyzer(data=df).conditional_probability("k0", "k1", export=False)),
+        ("categorical_analysis", lambda: ProbabilityAnalyzer(data=df).categorical_analysis("k0", export=False)),
+        # The app caps vectors at 100 rows.
+        ("vector_operations", lambda: ProbabilityAnalyzer(data=df).vector_operations(
+            df["c0"].values[:100], df["c1"].values[:100], export=False)),
+        ("query_boolean", lambda: CSVDataProcessor(None, data=df).query_boolean({"k0": "k0_3", "c2": 2010})),
+        ("plot_histogram", lambda: _render(viz.plot_histogram("c0", show=False))),
+        ("plot_line", lambda: _render(viz.plot_line("c2", "c1", show=False))),
+        ("plot_violin", lambda: _render(viz.plot_violin("c1", show=False))),
+        ("plot_box", lambda: _render(viz.plot_box("c3", show=False))),
+        ("plot_scatter", lambda: _render(viz.plot_scatter("c0", "c3", show=False))),
+        ("correlation_matrix", lambda: correlation_matrix(df, numeric)),
+    ]
+    return ops
+
+
+def time_call(func, repeat):
+    """Wall times of repeat calls, with the function's own printing suppressed."""
+    from src.cache import ANALYTICS_CACHE
+    times = []
+    for _ in range(repeat):
+        # Time the computation, not a memo hit from the previous repetition.
+        ANALYTICS_CACHE.clear()
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=CONFIG["APP_ROOT"],
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, ops=None, repeat=3, seed=0):
+    """Time every operation at every size; one row per (size, op)."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+    run = {
+        "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_revision(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+    rows = []
+    for size in sizes:
+        df = make_dataset(size, seed=seed)
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, func in _operations(df, workdir, size, only=ops):
+                if ops and name not in ops:
+                    continue
+                times = time_call(func, repeat)
+                rows.append(dict(run, rows=size, op=name, repeat=repeat,
+                                 min_s=round(min(times), 6), median_s=round(statistics.median(times), 6)))
+                print(f"{name:>24} @ {size:>11,} rows: {min(times):9.4f}s")
+    return pd.DataFrame(rows)
+
+
+def append_history(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        for record in results.to_dict("records"):
+            f.write(json.dumps(record) + "\n")
+
+
+def _result_key(op, rows):
+    return f"{op}@{rows}"
+
+
+def save_baseline(results, path):
+    from src.output_io import atomic_open
+    baseline = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": {_result_key(r["op"], r["rows"]): r["min_s"] for r in results.to_dict("records")},
+    }
+    with atomic_open(path) as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def check_regressions(results, baseline_path, tolerance=DEFAULT_TOLERANCE, min_delta=MIN_DELTA_SECONDS):
+    """Rows slower than the baseline by more than tolerance (relative) and min_delta seconds."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    flagged = []
+    for r in results.to_dict("records"):
+        base = baseline.get(_result_key(r["op"], r["rows"]))
+        if base is None:
+            continue
+        if r["min_s"] > base * (1 + tolerance) and r["min_s"] - base > min_delta:
+            flagged.append({"op": r["op"], "rows": r["rows"], "baseline_s": base, "current_s": r["min_s"],
+                            "ratio": round(r["min_s"] / base, 2) if base else np.inf})
+    return pd.DataFrame(flagged, columns=["op", "rows", "baseline_s", "current_s", "ratio"])
+
+
+def measure_import(module, runs=3):
+    """Best cold import time of module in fresh interpreters, and heavy modules it loaded."""
+    code = ("import sys, time; t = time.perf_counter(); import {m}; d = time.perf_counter() - t; "
+            "print(d); print(','.join(x for x in {heavy!r} if x in sys.modules))").format(m=module, heavy=HEAVY_MODULES)
+    best, loaded = None, []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=CONFIG["APP_ROOT"], capture_output=True,
+                             text=True, check=True).stdout.splitlines()
+        seconds = float(out[0])
+        best = seconds if best is None else min(best, seconds)
+        loaded = [name for name in out[1].split(",") if name] if len(out) > 1 else []
+    return best, loaded
+
+
+def check_import_budget(budgets=IMPORT_BUDGETS, runs=3):
+    """One row per module: cold import time, its budget and any heavy modules it imported."""
+    rows = []
+    for module, budget in budgets.items():
+        seconds, loaded = measure_import(module, runs)
+        rows.append({"module": module, "seconds": round(seconds, 4), "budget_s": budget,
+                     "heavy_imports": ",".join(loaded), "ok": seconds <= budget and not loaded})
+    return pd.DataFrame(rows)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analyses on synthetic data.")
+    parser.add_argument("--sizes", nargs="+", type=float, default=list(DEFAULT_SIZES),
+                        help="Row counts, e.g. 1e3 1e5 1e8 (default: 1e3 to 1e6).")
+    parser.add_argument("--ops", nargs="+", help="Only run these operations.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per operation (the minimum is kept).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default=os.path.join(BENCH_DIR, "history.jsonl"))
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="Store these timings as the baseline.")
+    parser.add_argument("--check", action="store_true", help="Compare against the baseline; exit 1 on regressions.")
+    parser.add_argument("--imports", action="store_true",
+                        help="Only check cold import times against IMPORT_BUDGETS; exit 1 if over budget.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown before a result is flagged (default: 0.25).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.imports:
+        report = check_import_budget()
+        print(report.to_string(index=False))
+        return 0 if report["ok"].all() else 1
+    sizes = [int(size) for size in args.sizes]
+    results = run_benchmarks(sizes, ops=args.ops, repeat=args.repeat, seed=args.seed)
+    append_history(results, args.history)
+    print(f"\n{len(results)} results appended to {args.history}")
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+            return 2
+        regressions = check_regressions(results, args.baseline, tolerance=args.tolerance)
+        if len(regressions):
+            print("\n=== Regressions ===")
+            print(regressions.to_string(index=False))
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
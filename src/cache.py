@@ -0,0 +1,377 @@
+import atexit
+import functools
+import hashlib
+import itertools
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.config import CONFIG
+
+
+def hash_bytes(data, *parts):
+    """Return a hex digest of raw bytes plus any extra key parts."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(data)
+    for part in parts:
+        h.update(repr(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+def frame_nbytes(obj):
+    """Estimate the in-memory size of a cached value in bytes."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        return sys.getsizeof(obj) + sum(frame_nbytes(v) for v in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(frame_nbytes(v) for v in obj.values())
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, (int, np.integer)):
+        # Index, ContingencyTable and similar containers report their own size.
+        return int(nbytes)
+    return sys.getsizeof(obj)
+
+
+class LRUByteCache:
+    """Thread-safe LRU cache bounded by the total byte size of its values."""
+
+    def __init__(self, max_bytes, sizeof=frame_nbytes):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key][0]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.current_bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                # Too large to ever fit; do not flush everything else for it.
+                return False
+            self._items[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self.current_bytes -= old_size
+                self.evictions += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current memory use."""
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class MemoCache(LRUByteCache):
+    """
+    LRUByteCache with an optional time-to-live per entry and an optional disk tier:
+    entries pushed out of memory are pickled under spill_dir and promoted back on
+    their next hit. Values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_bytes, ttl=None, spill_dir=None, spill_max_bytes=None, sizeof=frame_nbytes):
+        super().__init__(max_bytes, sizeof=sizeof)
+        self.ttl = ttl
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes if spill_max_bytes is not None else 4 * max_bytes
+        self._spilled = OrderedDict()
+        self.spill_bytes = 0
+        self.expirations = 0
+        self.spills = 0
+        self.spill_hits = 0
+        if spill_dir:
+            atexit.register(self._clear_spill)
+
+    def _expired(self, expires):
+        return expires is not None and time.monotonic() >= expires
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                value, size, expires = entry
+                if not self._expired(expires):
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._items[key]
+                self.current_bytes -= size
+                self.expirations += 1
+            spilled = self._spilled.pop(key, None)
+            if spilled is not None:
+                path, file_size, expires = spilled
+                self.spill_bytes -= file_size
+                value = None if self._expired(expires) else self._load(path)
+                _remove_file(path)
+                if value is not None:
+                    self.hits += 1
+                    self.spill_hits += 1
+                    self._insert(key, value[0], expires)
+                    return value[0]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            return self._insert(key, value, expires)
+
+    def _insert(self, key, value, expires):
+        size = self._sizeof(value)
+        if key in self._items:
+            self.current_bytes -= self._items.pop(key)[1]
+        if key in self._spilled:
+            path, file_size, _ = self._spilled.pop(key)
+            self.spill_bytes -= file_size
+            _remove_file(path)
+        if size > self.max_bytes:
+            # Too large for memory; keep it on disk if there is a disk tier.
+            return self._spill(key, value, expires)
+        self._items[key] = (value, size, expires)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            old_key, (old_value, old_size, old_expires) = self._items.popitem(last=False)
+            self.current_bytes -= old_size
+            self.evictions += 1
+            if not self._expired(old_expires):
+                self._spill(old_key, old_value, old_expires)
+        return True
+
+    def _spill_path(self, key):
+        # Per process: forked workers must not read or delete each other's files.
+        directory = os.path.join(self.spill_dir, str(os.getpid()))
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, hash_bytes(b"", key) + ".pkl")
+
+    def _spill(self, key, value, expires):
+        if not self.spill_dir:
+            return False
+        try:
+            path = self._spill_path(key)
+            with open(path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            file_size = os.path.getsize(path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return False
+        self._spilled[key] = (path, file_size, expires)
+        self.spill_bytes += file_size
+        self.spills += 1
+        while self.spill_bytes > self.spill_max_bytes and self._spilled:
+            _, (old_path, old_size, _) = self._spilled.popitem(last=False)
+            self.spill_bytes -= old_size
+            _remove_file(old_path)
+        return True
+
+    def _load(self, path):
+        try:
+            with open(path, "rb") as f:
+                return (pickle.load(f),)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _clear_spill(self):
+        for path, _, _ in self._spilled.values():
+            _remove_file(path)
+        self._spilled.clear()
+        self.spill_bytes = 0
+        if self.spill_dir:
+            shutil.rmtree(os.path.join(self.spill_dir, str(os.getpid())), ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+            self._clear_spill()
+
+    def discard(self, match):
+        """Drop every entry, in memory or spilled, whose key satisfies match(key)."""
+        with self._lock:
+            for key in [k for k in self._items if match(k)]:
+                self.current_bytes -= self._items.pop(key)[1]
+            for key in [k for k in self._spilled if match(k)]:
+                path, file_size, _ = self._spilled.pop(key)
+                self.spill_bytes -= file_size
+                _remove_file(path)
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats.update({
+                "ttl": self.ttl,
+                "expirations": self.expirations,
+                "spills": self.spills,
+                "spill_hits": self.spill_hits,
+                "spill_entries": len(self._spilled),
+                "spill_bytes": self.spill_bytes,
+            })
+        return stats
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_FINGERPRINTS = {}
+_FINGERPRINT_LOCK = threading.RLock()
+_FINGERPRINT_COUNTER = itertools.count()
+
+
+def dataset_fingerprint(data):
+    """
+    Cheap identity token for a DataFrame or Series: the same while the object is alive,
+    never reused after it is collected. Frames are treated as read-only; the shape is
+    included so columns added in place still change the key.
+    """
+    obj_id = id(data)
+    with _FINGERPRINT_LOCK:
+        entry = _FINGERPRINTS.get(obj_id)
+        if entry is None or entry[0]() is not data:
+            def forget(ref, obj_id=obj_id):
+                with _FINGERPRINT_LOCK:
+                    if _FINGERPRINTS.get(obj_id, (None,))[0] is ref:
+                        del _FINGERPRINTS[obj_id]
+            entry = (weakref.ref(data, forget), f"{os.getpid()}-{next(_FINGERPRINT_COUNTER)}")
+            _FINGERPRINTS[obj_id] = entry
+        return (entry[1], data.shape)
+
+
+def _mentions(key, token):
+    if isinstance(key, tuple):
+        if len(key) == 2 and key[0] == "data" and isinstance(key[1], tuple) and key[1][:1] == (token,):
+            return True
+        return any(_mentions(part, token) for part in key)
+    if isinstance(key, frozenset):
+        return any(_mentions(part, token) for part in key)
+    return False
+
+
+def forget_dataset(data):
+    """
+    Drop the memoized results keyed on data from every memo cache, so none of them
+    keeps data (or frames sharing its columns) alive.
+    """
+    with _FINGERPRINT_LOCK:
+        entry = _FINGERPRINTS.get(id(data))
+    if entry is None or entry[0]() is not data:
+        return
+    for cache in (CLEANING_CACHE, ANALYTICS_CACHE):
+        cache.discard(lambda key: _mentions(key, entry[1]))
+
+
+def _freeze(value):
+    """Hashable stand-in for a memoized function argument."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("data", dataset_fingerprint(value))
+    if isinstance(value, np.ndarray):
+        return ("array", value.shape, str(value.dtype), hash_bytes(np.ascontiguousarray(value).tobytes()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+_MISSING = object()
+
+
+def memoize(cache=None, name=None):
+    """
+    Cache a function's results keyed on its name, the fingerprint of any DataFrame
+    arguments and the remaining arguments. Uses ANALYTICS_CACHE unless cache is given.
+    """
+    def decorate(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target = ANALYTICS_CACHE if cache is None else cache
+            key = (label, _freeze(args), _freeze(kwargs))
+            value = target.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                target.set(key, value)
+            return value
+        return wrapper
+    return decorate
+
+
+# Rendered plot PNGs keyed by dataset version, plot kind, columns and style.
+FIGURE_CACHE = LRUByteCache(max_bytes=CONFIG["FIGURE_CACHE_MB"] * 1024 * 1024)
+
+# Per-column quantile sketches, one dict per cleaned dataset version.
+SKETCH_CACHE = LRUByteCache(
+    max_bytes=64 * 1024 * 1024,
+    sizeof=lambda sketches: sum(s.nbytes for s in sketches.values()),
+)
+
+# Pairwise contingency indexes, one per cleaned dataset version.
+INDEX_CACHE = LRUByteCache(
+    max_bytes=4 * CONFIG["CONTINGENCY_INDEX_MB"] * 1024 * 1024,
+    sizeof=lambda index: index.nbytes,
+)
+
+# Cleaned frames per missing-value strategy; sized by the columns they don't share.
+CLEANING_CACHE = MemoCache(max_bytes=CONFIG["CLEANING_CACHE_MB"] * 1024 * 1024)
+
+# Memoized analytics results (describe, contingency tables, correlation, ...).
+ANALYTICS_CACHE = MemoCache(
+    max_bytes=CONFIG["ANALYTICS_CACHE_MB"] * 1024 * 1024,
+    ttl=CONFIG["ANALYTICS_CACHE_TTL_S"],
+    spill_dir=CONFIG["ANALYTICS_SPILL_DIR"],
+)
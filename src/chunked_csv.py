@@ -0,0 +1,244 @@
+#%% IMPORTS
+import numpy as np
+import pandas as pd
+from src.correlation import CorrelationAccumulator
+from src.sketch import DEFAULT_K, build_sketches, sketch_summary
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_SAMPLE_ROWS = 10_000
+# Histogram resolution used to narrow down exact quantiles between passes.
+QUANTILE_BINS = 4096
+# Values per order statistic that may be held in memory for the final exact pass.
+QUANTILE_CANDIDATES = 65_536
+SUMMARY_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+def infer_dtypes(source, sample_rows=DEFAULT_SAMPLE_ROWS, **read_kwargs):
+    """
+    Infer column dtypes from the first sample_rows rows.
+    Integer and bool columns are left out so chunks holding NaNs can still widen to float.
+    """
+    sample = pd.read_csv(source, nrows=sample_rows, **read_kwargs)
+    dtypes = {}
+    for col in sample.columns:
+        dtype = sample[col].dtype
+        if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            continue
+        if pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = "float64"
+        else:
+            dtypes[col] = dtype
+    return list(sample.columns), dtypes
+
+
+class ChunkedCSVReader:
+    """
+    Stream a CSV file in fixed-size chunks so peak memory follows chunksize, not file size.
+    Aggregates (summary, crosstab, correlation) match the in-memory pandas results.
+    """
+
+    def __init__(self, source, chunksize=DEFAULT_CHUNKSIZE, sample_rows=DEFAULT_SAMPLE_ROWS, **read_kwargs):
+        self.source = source
+        self.chunksize = chunksize
+        self.read_kwargs = read_kwargs
+        self._rewind()
+        self.columns, self.dtypes = infer_dtypes(source, sample_rows=sample_rows, **read_kwargs)
+
+    def _rewind(self):
+        if hasattr(self.source, "seek"):
+            self.source.seek(0)
+
+    def iter_chunks(self, columns=None):
+        """Yield DataFrame chunks, optionally restricted to some columns."""
+        self._rewind()
+        dtypes = self.dtypes
+        if columns is not None:
+            dtypes = {c: t for c, t in dtypes.items() if c in columns}
+        reader = pd.read_csv(
+            self.source,
+            chunksize=self.chunksize,
+            dtype=dtypes,
+            usecols=columns,
+            **self.read_kwargs,
+        )
+        with reader:
+            for chunk in reader:
+                yield chunk
+
+    def read_all(self):
+        """
+        Materialize the whole file. Each chunk infers its own dtypes and concat widens
+        them, so a value the sample did not see (e.g. a string in a numeric column)
+        falls back to object dtype instead of failing the parse.
+        """
+        self._rewind()
+        with pd.read_csv(self.source, chunksize=self.chunksize, **self.read_kwargs) as reader:
+            return pd.concat(reader, ignore_index=True)
+
+    def count_rows(self):
+        first = self.columns[:1]
+        return sum(len(chunk) for chunk in self.iter_chunks(columns=first))
+
+    def numeric_columns(self):
+        """Numeric columns according to a one-chunk probe."""
+        probe = next(self.iter_chunks(), None)
+        if probe is None:
+            return []
+        return probe.select_dtypes(include="number").columns.tolist()
+
+    def sketches(self, k=DEFAULT_K):
+        """Quantile sketches for every numeric column in a single streaming pass."""
+        cols = self.numeric_columns()
+        return build_sketches(self.iter_chunks(columns=cols), columns=cols, k=k)
+
+    def summary(self, approximate=False):
+        """
+        Equivalent of DataFrame.describe() for numeric columns, computed out of core.
+        approximate=True takes one pass and reads quartiles from quantile sketches.
+        """
+        cols = self.numeric_columns()
+        if not cols:
+            return pd.DataFrame()
+        if approximate:
+            return sketch_summary(self.sketches())
+        p = len(cols)
+        count = np.zeros(p)
+        total = np.zeros(p)
+        mins = np.full(p, np.inf)
+        maxs = np.full(p, -np.inf)
+        for chunk in self.iter_chunks(columns=cols):
+            x = chunk[cols].to_numpy(dtype="float64", na_value=np.nan)
+            valid = ~np.isnan(x)
+            count += valid.sum(axis=0)
+            total += np.nansum(x, axis=0)
+            mins = np.fmin(mins, np.nanmin(np.where(valid, x, np.inf), axis=0))
+            maxs = np.fmax(maxs, np.nanmax(np.where(valid, x, -np.inf), axis=0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+        # Second pass for the centered sum of squares keeps std numerically stable.
+        sq = np.zeros(p)
+        for chunk in self.iter_chunks(columns=cols):
+            x = chunk[cols].to_numpy(dtype="float64", na_value=np.nan)
+            sq += np.nansum((x - mean) ** 2, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(sq / (count - 1))
+        mins[count == 0] = np.nan
+        maxs[count == 0] = np.nan
+
+        quantiles = self._exact_quantiles(cols, count, mins, maxs, SUMMARY_PERCENTILES)
+        rows = {"count": count, "mean": mean, "std": std, "min": mins}
+        for q, values in zip(SUMMARY_PERCENTILES, quantiles):
+            rows[f"{q * 100:g}%"] = values
+        rows["max"] = maxs
+        return pd.DataFrame(rows, index=cols).T
+
+    def _bin_index(self, x, lo, hi):
+        width = np.where(hi > lo, hi - lo, 1.0)
+        idx = np.floor((x - lo) / width * QUANTILE_BINS)
+        return np.clip(idx, 0, QUANTILE_BINS - 1)
+
+    def _exact_quantiles(self, cols, count, mins, maxs, qs):
+        """
+        Exact linear-interpolated quantiles. Each needed order statistic is narrowed down
+        by histogram passes over the values still in its bin, until at most
+        QUANTILE_CANDIDATES remain or they are all equal; only then are the values
+        collected, so memory stays bounded however skewed the column is.
+        """
+        # (column, 0-based rank) -> narrowing state; the ranks bracket each quantile.
+        targets = {}
+        for j in range(len(cols)):
+            n = int(count[j])
+            if n == 0:
+                continue
+            for q in qs:
+                h = (n - 1) * q
+                for rank in (int(np.floor(h)), int(np.ceil(h))):
+                    targets.setdefault((j, rank), {
+                        "path": [],
+                        "range": (mins[j], maxs[j]),
+                        "below": 0,
+                        "collect": n <= QUANTILE_CANDIDATES,
+                        "value": None,
+                    })
+        while any(t["value"] is None for t in targets.values()):
+            self._narrow_pass(cols, targets)
+
+        results = [np.full(len(cols), np.nan) for _ in qs]
+        for j in range(len(cols)):
+            n = int(count[j])
+            if n == 0:
+                continue
+            for k, q in enumerate(qs):
+                h = (n - 1) * q
+                lo_val = targets[(j, int(np.floor(h)))]["value"]
+                hi_val = targets[(j, int(np.ceil(h)))]["value"]
+                results[k][j] = lo_val + (hi_val - lo_val) * (h - np.floor(h))
+        return results
+
+    def _narrow_pass(self, cols, targets):
+        """One pass over the file that narrows or resolves every open target."""
+        open_targets = {key: t for key, t in targets.items() if t["value"] is None}
+        for t in open_targets.values():
+            t.update(seen=0, vmin=np.inf, vmax=-np.inf, parts=[],
+                     hist=np.zeros(QUANTILE_BINS, dtype=np.int64))
+        for chunk in self.iter_chunks(columns=cols):
+            x = chunk[cols].to_numpy(dtype="float64", na_value=np.nan)
+            for (j, _), t in open_targets.items():
+                v = x[:, j]
+                v = v[~np.isnan(v)]
+                # Values still in the target's bin at every earlier narrowing step.
+                for lo, hi, b in t["path"]:
+                    v = v[self._bin_index(v, lo, hi) == b]
+                if not v.size:
+                    continue
+                if t["collect"]:
+                    t["parts"].append(v)
+                    continue
+                t["seen"] += v.size
+                t["vmin"] = min(t["vmin"], v.min())
+                t["vmax"] = max(t["vmax"], v.max())
+                idx = self._bin_index(v, *t["range"]).astype(np.int64)
+                t["hist"] += np.bincount(idx, minlength=QUANTILE_BINS)
+
+        for (_, rank), t in open_targets.items():
+            if t["collect"]:
+                values = np.sort(np.concatenate(t["parts"]))
+                t["value"] = values[rank - t["below"]]
+            elif t["vmin"] == t["vmax"]:
+                t["value"] = t["vmin"]
+            elif t["seen"] <= QUANTILE_CANDIDATES:
+                t["collect"] = True
+            else:
+                cum = np.cumsum(t["hist"])
+                b = int(np.searchsorted(cum, rank - t["below"], side="right"))
+                if b > 0:
+                    t["below"] += int(cum[b - 1])
+                lo, hi = t["range"]
+                t["path"].append((lo, hi, b))
+                width = (hi - lo) / QUANTILE_BINS
+                t["range"] = (max(t["vmin"], lo + b * width), min(t["vmax"], lo + (b + 1) * width))
+            for scratch in ("seen", "vmin", "vmax", "parts", "hist"):
+                del t[scratch]
+
+    def crosstab(self, col1, col2, normalize=False):
+        """Streaming pd.crosstab(col1, col2); normalize accepts False or 'columns'."""
+        counts = None
+        for chunk in self.iter_chunks(columns=[col1, col2]):
+            part = chunk.groupby([col1, col2]).size()
+            counts = part if counts is None else counts.add(part, fill_value=0)
+        if counts is None:
+            return pd.DataFrame()
+        table = counts.unstack(fill_value=0).astype("int64").sort_index().sort_index(axis=1)
+        table.index.name = col1
+        table.columns.name = col2
+        if normalize == "columns":
+            return table / table.sum(axis=0)
+        return table
+
+    def correlation(self, columns=None):
+        """Pearson correlation with pairwise-complete observations, like DataFrame.corr()."""
+        cols = columns or self.numeric_columns()
+        accumulator = CorrelationAccumulator(cols)
+        for chunk in self.iter_chunks(columns=cols):
+            accumulator.update(chunk)
+        return accumulator.corr()
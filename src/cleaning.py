@@ -0,0 +1,96 @@
+#%% IMPORTS
+import pandas as pd
+from src.cache import CLEANING_CACHE, frame_nbytes, memoize
+from src.column_profile import column_profile
+from src.tracing import traced
+
+MISSING_STRATEGIES = [
+    "None",
+    "Drop rows with missing values",
+    "Fill numeric NaNs with mean",
+    "Fill numeric NaNs with median",
+    "Fill categorical NaNs with 'Unknown'",
+    "Custom fill value (single column)",
+]
+
+
+class CleanedFrame:
+    """A cleaned frame and its column profile."""
+
+    def __init__(self, frame, profile):
+        self.frame = frame
+        self.profile = profile
+
+    @property
+    def nbytes(self):
+        # Columns shared with the source count too: this entry keeps them alive.
+        return frame_nbytes(self.frame) + self.profile.nbytes
+
+
+def fill_column(series, value):
+    """series with NaNs replaced by value; categorical columns gain value as a category."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+@memoize(cache=CLEANING_CACHE)
+def _clean(data, strategy, column, value):
+    """CleanedFrame for a strategy, or None when it would leave data unchanged."""
+    profile = column_profile(data)
+    if strategy == "Drop rows with missing values":
+        frame = data.dropna()
+        if len(frame) == len(data):
+            return None
+        return CleanedFrame(frame, profile.after_dropna(frame))
+
+    with_nulls = [col for col in profile.columns if profile.null_counts[col] > 0]
+    if strategy == "Fill numeric NaNs with mean":
+        cols = [col for col in profile.numeric_columns if col in with_nulls]
+        fills = data[cols].mean().to_dict() if cols else {}
+    elif strategy == "Fill numeric NaNs with median":
+        cols = [col for col in profile.numeric_columns if col in with_nulls]
+        fills = data[cols].median().to_dict() if cols else {}
+    elif strategy == "Fill categorical NaNs with 'Unknown'":
+        fills = dict.fromkeys((col for col in profile.other_columns if col in with_nulls), "Unknown")
+    elif strategy == "Custom fill value (single column)" and column in with_nulls:
+        if column in profile.numeric_columns:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        fills = {column: value}
+    else:
+        fills = {}
+    fills = {col: fill for col, fill in fills.items() if not pd.isna(fill)}
+    if not fills:
+        return None
+
+    # Shallow copy: untouched columns stay shared with data (copy-on-write keeps data intact).
+    frame = data.copy(deep=False)
+    for col, fill in fills.items():
+        frame[col] = fill_column(data[col], fill)
+    return CleanedFrame(frame, profile.after_fill(frame, fills))
+
+
+@traced("handle_missing_values")
+def handle_missing_values(data, strategy, column=None, value=None):
+    """
+    Apply a missing-value strategy. Returns (frame, profile) where frame shares every
+    column it doesn't change with data. Results that differ from data are memoized per
+    (dataset, strategy, column, value), so switching back to a strategy reuses the same
+    frame; like other shared frames it must be treated as read-only. When nothing
+    would change, data itself is returned and nothing is cached.
+    """
+    profile = column_profile(data)
+    if strategy == "None" or not (profile.null_counts > 0).any():
+        return data, profile
+    if strategy != "Custom fill value (single column)" or value is None or not column:
+        # column/value only matter for the custom fill; keep them out of the cache key.
+        column = value = None
+        if strategy == "Custom fill value (single column)":
+            return data, profile
+    result = _clean(data, strategy, column, value)
+    if result is None:
+        return data, profile
+    return result.frame, result.profile
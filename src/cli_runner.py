@@ -3,10 +3,12 @@
 
 module_name_gl = 'main'
 
-from src.config import show_config, CONFIG
+from src.config import show_config, CONFIG, plotting
 from src.data_handler import CSVDataProcessor
 from src.analytics import ProbabilityAnalyzer
 from src.pickle_processor import PickleProcessor
+from src.columnar_store import convert_to_columnar, is_current
+from src.dataset_registry import REGISTRY
 from src.module_tmp import (
     DEFAULT_SHAPE,
     make_numpy_dataframe,
@@ -17,134 +19,242 @@ from src.module_tmp import (
     make_counter,
     TempCache,
 )
-import matplotlib.pyplot as plt
+from src.output_io import atomic_path, output_path
+from src.pipeline import Stage, run_stages, warm_matplotlib
+from src.tracing import TRACER
+import argparse
 import os
 
 
-def main():
-    print(f"\"{module_name_gl}\" module begins.")
-    print("=== Used Car Analysis Project ===")
-    show_config()
+def stage_basic_info(ctx):
+    processor = ctx["processor"]
+    print("\n=== Basic Info ===")
+    print(processor.data.info())
+    print("\n=== Basic Statistics ===")
+    print(processor.summary())
 
-    os.makedirs("Output", exist_ok=True)
 
-    csv_file = CONFIG["DATA_FILE"].replace(".pkl", ".csv")
-    processor = CSVDataProcessor(csv_file)
+def stage_histogram(ctx):
+    ctx["processor"].plot_histogram(
+        'Selling_Price',
+        show=False,
+        save_path=output_path("histogram_Selling_Price.png")
+    )
+
+
+def stage_line(ctx):
+    ctx["processor"].plot_line(
+        'Year',
+        'Selling_Price',
+        show=False,
+        save_path=output_path("line_Year_Selling_Price.png")
+    )
+
+
+def stage_violin(ctx):
+    ctx["processor"].plot_violin(
+        'Selling_Price',
+        show=False,
+        save_path=output_path("violin_Selling_Price.png")
+    )
+
+
+def stage_box(ctx):
+    ctx["processor"].plot_box(
+        'Present_Price',
+        show=False,
+        save_path=output_path("box_Present_Price.png")
+    )
+
+
+def stage_scatter(ctx):
+    ctx["processor"].plot_scatter(
+        'Kms_Driven',
+        'Selling_Price',
+        show=False,
+        save_path=output_path("scatter_Kms_Driven_Selling_Price.png")
+    )
+
+
+def stage_simple_query(ctx):
+    print("\n=== Simple Query ===")
+    result_simple = ctx["processor"].query_simple('Owner', 0)
+    print(result_simple.head())
+
+
+def stage_boolean_query(ctx):
+    print("\n=== Boolean Query ===")
+    conditions = {'Fuel_Type': 'Petrol', 'Owner': 0}
+    result_boolean = ctx["processor"].query_boolean(conditions)
+    print(result_boolean.head())
+
+
+def stage_boolean_indexing(ctx):
+    # Boolean indexing example
+    processor = ctx["processor"]
+    try:
+        mask = (processor.data["Owner"] == 0) & (processor.data["Fuel_Type"] == "Petrol")
+        print("\n=== Boolean Indexing Example ===")
+        print(processor.data[mask].head())
+    except Exception as exc:
+        processor.log(f"Boolean indexing error: {exc}")
+
+
+def stage_module_tmp(ctx):
+    # *args / **kwargs, lambda, eval, nonlocal, and private-like variable usage
+    print("\n=== module_tmp Features ===")
+    tmp_rows, tmp_cols = DEFAULT_SHAPE
+    numpy_df = make_numpy_dataframe(tmp_rows, tmp_cols)
+    with atomic_path(output_path("numpy_df.csv")) as tmp:
+        numpy_df.to_csv(tmp, index=False)
+    export_dataframe_pickle(numpy_df, output_path("numpy_df.pkl"))
+    summary_all = summarize_with_kwargs(numpy_df, include="all")
+    print(summary_all)
+
+    eval_result = safe_eval("a + b * 2", a=2, b=3)
+    print(f"Eval result: {eval_result}")
+
+    transformed = apply_transformations([1, 2, 3], lambda x: x * 2, lambda x: x + 1)
+    print(f"Transformed values: {transformed}")
+
+    counter = make_counter()
+    print(f"Nonlocal counter: {counter()}, {counter()}")
+
+    cache = TempCache()
+    cache.set("status", "ok")
+    print(f"Private-like cache value: {cache.get('status')}")
+
+
+def stage_analyzer_summary(ctx):
+    ctx["analyzer"].show_summary()
 
-    if processor.data is not None:
-        processor.log("CSV data loaded successfully.")
-        print("\n=== Basic Info ===")
-        print(processor.data.info())
-        print("\n=== Basic Statistics ===")
-        print(processor.data.describe())
-
-        print("\n=== Parent Class Plots ===")
-        try:
-            processor.plot_histogram(
-                'Selling_Price',
-                show=False,
-                save_path="Output/histogram_Selling_Price.png"
-            )
-            processor.plot_line(
-                'Year',
-                'Selling_Price',
-                show=False,
-                save_path="Output/line_Year_Selling_Price.png"
-            )
-        except Exception as exc:
-            processor.log(f"Plot error (parent plots): {exc}")
-
-        print("\n=== Child Class Plots ===")
-        try:
-            processor.plot_violin(
-                'Selling_Price',
-                show=False,
-                save_path="Output/violin_Selling_Price.png"
-            )
-            processor.plot_box(
-                'Present_Price',
-                show=False,
-                save_path="Output/box_Present_Price.png"
-            )
-            processor.plot_scatter(
-                'Kms_Driven',
-                'Selling_Price',
-                show=False,
-                save_path="Output/scatter_Kms_Driven_Selling_Price.png"
-            )
-        except Exception as exc:
-            processor.log(f"Plot error (child plots): {exc}")
-
-        print("\n=== Simple Query ===")
-        result_simple = processor.query_simple('Owner', 0)
-        print(result_simple.head())
-
-        print("\n=== Boolean Query ===")
-        conditions = {'Fuel_Type': 'Petrol', 'Owner': 0}
-        result_boolean = processor.query_boolean(conditions)
-        print(result_boolean.head())
-
-        # Boolean indexing example
-        try:
-            mask = (processor.data["Owner"] == 0) & (processor.data["Fuel_Type"] == "Petrol")
-            print("\n=== Boolean Indexing Example ===")
-            print(processor.data[mask].head())
-        except Exception as exc:
-            processor.log(f"Boolean indexing error: {exc}")
-
-        # *args / **kwargs, lambda, eval, nonlocal, and private-like variable usage
-        print("\n=== module_tmp Features ===")
-        tmp_rows, tmp_cols = DEFAULT_SHAPE
-        numpy_df = make_numpy_dataframe(tmp_rows, tmp_cols)
-        numpy_df.to_csv("Output/numpy_df.csv", index=False)
-        export_dataframe_pickle(numpy_df, "Output/numpy_df.pkl")
-        summary_all = summarize_with_kwargs(numpy_df, include="all")
-        print(summary_all)
-
-        eval_result = safe_eval("a + b * 2", a=2, b=3)
-        print(f"Eval result: {eval_result}")
-
-        transformed = apply_transformations([1, 2, 3], lambda x: x * 2, lambda x: x + 1)
-        print(f"Transformed values: {transformed}")
-
-        counter = make_counter()
-        print(f"Nonlocal counter: {counter()}, {counter()}")
-
-        cache = TempCache()
-        cache.set("status", "ok")
-        print(f"Private-like cache value: {cache.get('status')}")
-        processor.log("Completed CSV analysis steps.")
-
-    # === PART 2: ANALYTICS (PICKLE DATA, VECTOR + PROBABILITY) ===
-    print("\n=== Probability & Vector Analysis ===")
-    pickle_file = CONFIG["DATA_FILE"]
-    analyzer = ProbabilityAnalyzer(pickle_file)
-    analyzer.read_pickle()
-    analyzer.show_summary()
 
+def stage_pickle_summary(ctx):
     # Mean / Median / Std from pickle data
-    pickle_processor = PickleProcessor(pickle_file)
-    pickle_processor.read_pickle()
-    pickle_processor.show_summary()
+    ctx["pickle_processor"].show_summary()
 
-    # Probability computations
-    analyzer.joint_counts("Fuel_Type", "Transmission")
-    analyzer.joint_probability("Fuel_Type", "Transmission")
-    analyzer.conditional_probability("Fuel_Type", "Seller_Type")
 
+def stage_joint(ctx):
+    # Counts and probabilities share one contingency table, so they stay in one stage.
+    ctx["analyzer"].joint_counts("Fuel_Type", "Transmission")
+    ctx["analyzer"].joint_probability("Fuel_Type", "Transmission")
+
+
+def stage_conditional(ctx):
+    ctx["analyzer"].conditional_probability("Fuel_Type", "Seller_Type")
+
+
+def stage_vectors(ctx):
     # Vector operations
+    analyzer = ctx["analyzer"]
     vec_a = analyzer.data["Selling_Price"].values[:5]
     vec_b = analyzer.data["Present_Price"].values[:5]
     analyzer.vector_operations(vec_a, vec_b)
 
+
+def stage_categorical(ctx):
     # Categorical analysis
-    analyzer.categorical_analysis("Fuel_Type")
+    ctx["analyzer"].categorical_analysis("Fuel_Type")
+
+
+CSV_STAGES = [
+    Stage("basic_info", stage_basic_info),
+    Stage("simple_query", stage_simple_query),
+    Stage("boolean_query", stage_boolean_query),
+    Stage("boolean_indexing", stage_boolean_indexing),
+    Stage("module_tmp", stage_module_tmp),
+]
+
+PLOT_STAGES = [
+    Stage("histogram", stage_histogram),
+    Stage("line", stage_line),
+    Stage("violin", stage_violin),
+    Stage("box", stage_box),
+    Stage("scatter", stage_scatter),
+]
+
+ANALYSIS_STAGES = [
+    Stage("analyzer_summary", stage_analyzer_summary),
+    Stage("pickle_summary", stage_pickle_summary),
+    Stage("joint", stage_joint),
+    Stage("conditional", stage_conditional),
+    Stage("vectors", stage_vectors),
+    Stage("categorical", stage_categorical),
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Used car analysis pipeline.")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes for independent stages (default: 1).")
+    parser.add_argument("--no-plots", action="store_true",
+                        help="Skip the plot stages; matplotlib and seaborn are then never imported.")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Record per-stage and per-call timings and write a Chrome trace JSON to PATH.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="With --trace, also record peak traced allocations (slower).")
+    return parser.parse_args(argv)
+
+
+def run_pipeline(csv_file, analysis_file, jobs=1, plots=True):
+    """
+    Run every stage for one dataset, writing artifacts under CONFIG["OUTPUT_DIR"].
+    Returns the stage timing table.
+    """
+    os.makedirs(CONFIG["OUTPUT_DIR"], exist_ok=True)
+
+    # Everything is loaded here, before any worker starts, so the workers share it.
+    processor = CSVDataProcessor(csv_file)
+    analyzer = ProbabilityAnalyzer(analysis_file)
+    analyzer.read_pickle()
+    pickle_processor = PickleProcessor(analysis_file, data=analyzer.data)
 
+    stages = []
+    if processor.data is not None:
+        processor.log("CSV data loaded successfully.")
+        stages += CSV_STAGES[:1]
+        if plots:
+            stages += PLOT_STAGES
+        stages += CSV_STAGES[1:]
+    stages += ANALYSIS_STAGES
+
+    ctx = {"processor": processor, "analyzer": analyzer, "pickle_processor": pickle_processor}
+    print(f"\n=== Running {len(stages)} stages with {max(jobs, 1)} job(s) ===")
+    # Load the plotting stack once before forking instead of once per worker.
+    preload = (plotting, warm_matplotlib) if plots else ()
+    timings = run_stages(stages, ctx, jobs=jobs, preload=preload)
+
+    processor.log("Completed CSV analysis steps.")
     processor.log("Completed pickle analysis steps.")
-    print("\nAll outputs generated in Output/ folder!")
+    return timings
 
 
-if __name__ == "__main__":
-    main()
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace:
+        TRACER.enable(memory=args.trace_memory)
+    print(f"\"{module_name_gl}\" module begins.")
+    print("=== Used Car Analysis Project ===")
+    show_config()
+
+    csv_file = CONFIG["DATA_FILE"].replace(".pkl", ".csv")
+    pickle_file = CONFIG["DATA_FILE"]
+    columnar_file = CONFIG["COLUMNAR_FILE"]
+    if not is_current(columnar_file, pickle_file):
+        # Converted once per version of the pickle; later runs memory-map the columnar copy.
+        convert_to_columnar(pickle_file, columnar_file)
+    timings = run_pipeline(csv_file, columnar_file, jobs=args.jobs, plots=not args.no_plots)
 
+    print("\n=== Stage Timings ===")
+    print(timings.to_string(index=False))
+    if args.trace:
+        print("\n=== Trace Summary ===")
+        print(TRACER.summary().to_string(index=False))
+        print(f"Chrome trace written to {TRACER.export_chrome(args.trace)}")
+    print("\n=== Dataset Registry ===")
+    print(REGISTRY.report().to_string(index=False))
+    print(f"\nAll outputs generated in {CONFIG['OUTPUT_DIR']}/ folder!")
 
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#%% IMPORTS
+import numpy as np
+import pandas as pd
+from src.cache import memoize
+from src.config import CONFIG
+
+# Rows hashed per block while building the distinct-value sketches.
+HASH_BLOCK_ROWS = 1_000_000
+_HASH_SPACE = float(2 ** 64)
+
+
+def hash_values(series):
+    """64-bit hashes of the non-null values of a column (equal values hash equal)."""
+    return pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy()
+
+
+def kmv_merge(kept, hashes, k):
+    """k smallest distinct hashes of kept (sorted) and hashes."""
+    if len(kept) >= k:
+        # Only hashes below the current k-th smallest can enter the sketch.
+        hashes = hashes[hashes < kept[-1]]
+    return np.unique(np.concatenate([kept, hashes]))[:k]
+
+
+def kmv_estimate(kept, k):
+    """Distinct-value estimate from a KMV sketch; exact while fewer than k values were seen."""
+    if len(kept) < k:
+        return len(kept)
+    return int(round((k - 1) * _HASH_SPACE / float(kept[-1])))
+
+
+class DatasetProfile:
+    """
+    Per-column dtype, null count, distinct-value estimate (KMV sketch), numeric min/max
+    and memory footprint, computed in one scan per dataset version. Missing-value
+    handling derives the cleaned frame's profile from it without rescanning.
+    """
+
+    def __init__(self, rows, table, sketches, k):
+        self.rows = rows
+        self.table = table
+        self.sketches = sketches
+        self.k = k
+
+    @classmethod
+    def from_frame(cls, data, k=None):
+        k = CONFIG["PROFILE_KMV_K"] if k is None else k
+        nulls = data.isna().sum()
+        memory = data.memory_usage(index=False, deep=True)
+        records = []
+        sketches = {}
+        for col in data.columns:
+            series = data[col]
+            numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            kept = np.empty(0, dtype=np.uint64)
+            for start in range(0, len(series), HASH_BLOCK_ROWS):
+                kept = kmv_merge(kept, hash_values(series.iloc[start:start + HASH_BLOCK_ROWS]), k)
+            sketches[col] = kept
+            records.append({
+                "column": col,
+                "dtype": str(series.dtype),
+                "numeric": numeric,
+                "nulls": int(nulls[col]),
+                "distinct": kmv_estimate(kept, k),
+                "min": series.min() if numeric and nulls[col] < len(series) else np.nan,
+                "max": series.max() if numeric and nulls[col] < len(series) else np.nan,
+                "memory_bytes": int(memory[col]),
+            })
+        table = pd.DataFrame(records, columns=["column", "dtype", "numeric", "nulls", "distinct",
+                                               "min", "max", "memory_bytes"]).set_index("column")
+        return cls(len(data), table, sketches, k)
+
+    @property
+    def nbytes(self):
+        return int(self.table.memory_usage(deep=True).sum() + sum(s.nbytes for s in self.sketches.values()))
+
+    @property
+    def columns(self):
+        return self.table.index.tolist()
+
+    @property
+    def numeric_columns(self):
+        return self.table.index[self.table["numeric"]].tolist()
+
+    @property
+    def other_columns(self):
+        return self.table.index[~self.table["numeric"]].tolist()
+
+    @property
+    def null_counts(self):
+        return self.table["nulls"]
+
+    def missing(self):
+        """missing_count per column that has missing values."""
+        nulls = self.table["nulls"].rename("missing_count").to_frame()
+        return nulls[nulls["missing_count"] > 0]
+
+    def _copy(self):
+        return DatasetProfile(self.rows, self.table.copy(), dict(self.sketches), self.k)
+
+    def after_fill(self, data, fills):
+        """
+        Profile of data, which is this profile's frame with the NaNs of each column in
+        fills replaced by fills[column]. Only the filled columns' entries change; memory
+        footprints are kept as they were.
+        """
+        profile = self._copy()
+        table = profile.table
+        for col, value in fills.items():
+            # A NaN fill (e.g. the mean of an all-NaN column) leaves the column as it was.
+            if table.at[col, "nulls"] == 0 or pd.isna(value):
+                continue
+            series_dtype = data[col].dtype
+            table.at[col, "nulls"] = 0
+            table.at[col, "dtype"] = str(series_dtype)
+            profile.sketches[col] = kmv_merge(profile.sketches[col],
+                                              hash_values(pd.Series([value], dtype=series_dtype)), self.k)
+            table.at[col, "distinct"] = kmv_estimate(profile.sketches[col], self.k)
+            numeric = pd.api.types.is_numeric_dtype(series_dtype) and not pd.api.types.is_bool_dtype(series_dtype)
+            table.at[col, "numeric"] = numeric
+            if numeric:
+                table.at[col, "min"] = np.nanmin([table.at[col, "min"], value])
+                table.at[col, "max"] = np.nanmax([table.at[col, "max"], value])
+            else:
+                table.at[col, "min"] = table.at[col, "max"] = np.nan
+        return profile
+
+    def after_dropna(self, data):
+        """
+        Profile of data, which is this profile's frame after dropna(). Null counts and
+        rows are exact; memory is scaled by the rows kept. min/max and distinct counts
+        are those of the undropped frame (bounds for the remaining rows).
+        """
+        profile = self._copy()
+        if self.rows:
+            kept = len(data) / self.rows
+            profile.table["memory_bytes"] = (profile.table["memory_bytes"] * kept).round().astype("int64")
+        profile.table["nulls"] = 0
+        profile.rows = len(data)
+        return profile
+
+
+@memoize()
+def column_profile(data):
+    """DatasetProfile of data, computed once per dataset."""
+    return DatasetProfile.from_frame(data)
@@ -0,0 +1,182 @@
+"""
+Columnar on-disk dataset format: one .npy file per column plus a meta.json header.
+Numeric, bool and datetime columns are memory-mapped on load; text columns are
+stored as integer codes with a category list, and categorical columns keep their
+categories and ordering. Only requested columns are read. A converted copy records
+the size and mtime of its source so stale copies can be detected.
+
+One-time conversion:
+    python -m src.columnar_store data/demo/car_data.pkl data/demo/car_data.cols
+"""
+import json
+import os
+import pickle
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+
+def is_columnar(path):
+    """True if path points at a columnar dataset directory."""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def source_fingerprint(source):
+    """Size and modification time of a source file, stored with its columnar copy."""
+    stat = os.stat(source)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_current(path, source):
+    """True if path is a columnar copy converted from source as it is now."""
+    if not is_columnar(path):
+        return False
+    return read_meta(path).get("source") == source_fingerprint(source)
+
+
+def _is_raw_dtype(dtype):
+    # Plain NumPy dtypes that round-trip through .npy without pickling.
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufcmM"
+
+
+def _write_column(series, out_dir, file_stem):
+    entry = {"dtype": str(series.dtype)}
+    if _is_raw_dtype(series.dtype):
+        entry["kind"] = "raw"
+        entry["file"] = f"{file_stem}.npy"
+        np.save(os.path.join(out_dir, entry["file"]), np.ascontiguousarray(series.to_numpy()))
+        return entry
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Keep the dtype's own categories (order included) rather than those seen.
+        codes, categories = series.cat.codes.to_numpy(), list(series.cat.categories)
+        entry["ordered"] = bool(series.cat.ordered)
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        categories = list(uniques)
+    n = len(categories)
+    code_dtype = np.int8 if n < 2**7 else np.int16 if n < 2**15 else np.int32
+    entry["kind"] = "categorical"
+    entry["file"] = f"{file_stem}.npy"
+    np.save(os.path.join(out_dir, entry["file"]), codes.astype(code_dtype))
+    if all(isinstance(v, str) for v in categories):
+        entry["categories"] = categories
+    else:
+        entry["categories_file"] = f"{file_stem}.categories.pkl"
+        with open(os.path.join(out_dir, entry["categories_file"]), "wb") as f:
+            pickle.dump(categories, f)
+    return entry
+
+
+def write_columnar(df, path, source=None):
+    """
+    Write a DataFrame as a columnar dataset directory, replacing any existing one.
+    source is the file df was read from, fingerprinted for is_current().
+    """
+    tmp_dir = path.rstrip(os.sep) + ".tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    meta = {"version": FORMAT_VERSION, "nrows": len(df), "columns": [], "index": None}
+    if source is not None:
+        meta["source"] = source_fingerprint(source)
+    for i, col in enumerate(df.columns):
+        entry = _write_column(df[col], tmp_dir, f"c{i}")
+        entry["name"] = col
+        meta["columns"].append(entry)
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        meta["index"] = _write_column(df.index.to_series(), tmp_dir, "index")
+        meta["index"]["name"] = df.index.name
+
+    with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_dir, path)
+    return path
+
+
+def read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+def _read_column(path, entry, mmap):
+    values = np.load(os.path.join(path, entry["file"]), mmap_mode="c" if mmap else None)
+    if entry["kind"] == "raw":
+        return values
+    if "categories" in entry:
+        categories = entry["categories"]
+    else:
+        with open(os.path.join(path, entry["categories_file"]), "rb") as f:
+            categories = pickle.load(f)
+    if "ordered" in entry:
+        return pd.Categorical.from_codes(np.asarray(values, dtype=np.int64), categories=categories,
+                                         ordered=entry["ordered"])
+    # Code -1 marks a missing value; append NaN so take() maps it there.
+    lookup = np.array(list(categories) + [np.nan], dtype=object)
+    result = pd.Series(lookup.take(np.asarray(values, dtype=np.int64)), dtype=object)
+    if entry["dtype"] != "object":
+        try:
+            result = result.astype(entry["dtype"])
+        except (TypeError, ValueError):
+            pass
+    return result.array
+
+
+def read_columnar(path, columns=None, mmap=True):
+    """Load a columnar dataset, reading only the requested columns."""
+    meta = read_meta(path)
+    entries = {e["name"]: e for e in meta["columns"]}
+    wanted = list(entries) if columns is None else list(columns)
+    missing = [c for c in wanted if c not in entries]
+    if missing:
+        raise KeyError(f"Columns not found: {missing}")
+
+    index = pd.RangeIndex(meta["nrows"])
+    if meta["index"] is not None:
+        index = pd.Index(_read_column(path, meta["index"], mmap), name=meta["index"]["name"])
+    data = {}
+    for col in wanted:
+        values = _read_column(path, entries[col], mmap)
+        # Series keep object columns as object instead of re-inferring them.
+        data[col] = pd.Series(values, index=index, dtype=values.dtype, copy=False)
+    return pd.DataFrame(data, columns=wanted, copy=False)
+
+
+def load_dataset(path, columns=None):
+    """Load a CSV, pickle or columnar dataset, restricted to columns if given."""
+    if is_columnar(path):
+        return read_columnar(path, columns=columns)
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path, usecols=columns)
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    if columns is not None and isinstance(data, pd.DataFrame):
+        data = data[list(columns)]
+    return data
+
+
+def convert_to_columnar(source, dest=None):
+    """One-time conversion of a CSV or pickle file into the columnar format."""
+    if dest is None:
+        dest = os.path.splitext(source)[0] + ".cols"
+    df = load_dataset(source)
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"{source} does not contain a pandas DataFrame.")
+    write_columnar(df, dest, source=source)
+    print(f"Converted {source} -> {dest} ({df.shape[0]} rows, {df.shape[1]} columns)")
+    return dest
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m src.columnar_store SOURCE [DEST]")
+        sys.exit(1)
+    convert_to_columnar(*sys.argv[1:])
@@ -1,5 +1,3 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 
 APP_ROOT = Path(__file__).resolve().parents[1]
@@ -9,9 +7,43 @@ CONFIG = {
     "APP_ROOT": str(APP_ROOT),
     "BASE_DIR": str(BASE_DIR),
     "DATA_FILE": str(APP_ROOT / "data" / "demo" / "car_data.pkl"),
+    "COLUMNAR_FILE": str(APP_ROOT / "data" / "demo" / "car_data.cols"),
     "PLOT_STYLE": "darkgrid",
     "FIG_SIZE": (10, 6),
     "TARGET_COLUMN": "Selling_Price",
+    "OUTPUT_DIR": "Output",
+    "LOG_FILE": "log.jsonl",
+    "LOG_BUFFER_RECORDS": 1000,
+    "LOG_FLUSH_SECONDS": 2.0,
+    "UI_LOG_DIR": None,
+    "DATASET_STORE_MB": 2048,
+    "DATASET_SPILL_DIR": None,
+    "FIGURE_CACHE_MB": 128,
+    "ANALYTICS_CACHE_MB": 256,
+    "ANALYTICS_CACHE_TTL_S": None,
+    "ANALYTICS_SPILL_DIR": None,
+    "CLEANING_CACHE_MB": 512,
+    "MAX_UPLOAD_MB": 50,
+    "CONTINGENCY_INDEX": True,
+    "CONTINGENCY_MAX_CARDINALITY": 50,
+    "CONTINGENCY_INDEX_MB": 64,
+    "CONTINGENCY_MAX_PAIRS": 500,
+    "LARGE_DATA_THRESHOLD": 50_000,
+    "LINE_MAX_POINTS": 2000,
+    "LINE_DECIMATION": "lttb",
+    "SCATTER_MODE": "hexbin",
+    "SCATTER_GRIDSIZE": 80,
+    "KDE_BINNED_THRESHOLD": 20_000,
+    "SKETCH_K": 1000,
+    "APPROX_ROWS_THRESHOLD": 1_000_000,
+    "APPROX_SAMPLE_ROWS": (10_000, 100_000, 1_000_000),
+    "APPROX_MIN_PER_STRATUM": 30,
+    "APPROX_CONFIDENCE": 0.95,
+    "APPROX_POLL_SECONDS": 1.0,
+    "APPROX_REFINEMENTS_MB": 64,
+    "PROFILE_KMV_K": 1024,
+    "BACKGROUND_WORKERS": 4,
+    "BACKGROUND_POLL_SECONDS": 0.5,
 }
 
 
@@ -22,6 +54,27 @@ def show_config():
         print(f"{key}: {value}")
 
 
-sns.set_style(CONFIG["PLOT_STYLE"])
-plt.rcParams["figure.figsize"] = CONFIG["FIG_SIZE"]
+_STYLE_APPLIED = False
+
+
+def apply_plot_style():
+    """Apply the configured seaborn style and figure size (once per process)."""
+    global _STYLE_APPLIED
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    if not _STYLE_APPLIED:
+        sns.set_style(CONFIG["PLOT_STYLE"])
+        plt.rcParams["figure.figsize"] = CONFIG["FIG_SIZE"]
+        _STYLE_APPLIED = True
+
+
+def plotting():
+    """
+    matplotlib.pyplot and seaborn, imported on first use with the style applied.
+    Kept out of module import so runs without plots never load the plotting stack.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    apply_plot_style()
+    return plt, sns
 
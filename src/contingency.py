@@ -0,0 +1,191 @@
+#%% IMPORTS
+import numpy as np
+import pandas as pd
+
+# Above this many cells (rows x columns) the count matrix is kept sparse, and tables
+# are returned with SparseArray columns (same crosstab shape, zeros not stored).
+SPARSE_CELL_THRESHOLD = 10_000_000
+
+
+def factorize_column(series):
+    """Encode a column as integer codes (-1 for missing) plus its sorted labels."""
+    try:
+        codes, uniques = pd.factorize(series, sort=True, use_na_sentinel=True)
+    except TypeError:
+        # Mixed types that cannot be ordered keep first-seen order.
+        codes, uniques = pd.factorize(series, sort=False, use_na_sentinel=True)
+    return codes, pd.Index(uniques, name=series.name)
+
+
+class ContingencyTable:
+    """
+    One shared count matrix for two factorized columns.
+    Joint counts, joint probabilities and conditional probabilities are all derived from it,
+    matching pd.crosstab (rows with a missing value in either column are dropped).
+    """
+
+    def __init__(self, codes1, labels1, codes2, labels2, total_rows=None):
+        self.total_rows = len(codes1) if total_rows is None else total_rows
+        n1, n2 = len(labels1), len(labels2)
+        valid = (codes1 >= 0) & (codes2 >= 0)
+        flat = codes1[valid].astype(np.int64) * n2 + codes2[valid]
+        self.sparse = n1 * n2 > SPARSE_CELL_THRESHOLD
+
+        if self.sparse:
+            keys, counts = np.unique(flat, return_counts=True)
+            rows, cols = keys // n2, keys % n2
+            self.rows, self.cols, self.cell_counts = rows, cols, counts.astype(np.int64)
+            row_totals = np.bincount(rows, weights=counts, minlength=n1)
+            col_totals = np.bincount(cols, weights=counts, minlength=n2)
+        else:
+            matrix = np.bincount(flat, minlength=n1 * n2).reshape(n1, n2)
+            row_totals = matrix.sum(axis=1)
+            col_totals = matrix.sum(axis=0)
+
+        # Labels only seen next to a missing value in the other column are dropped, like crosstab.
+        keep_rows = row_totals > 0
+        keep_cols = col_totals > 0
+        self.labels1 = labels1[keep_rows]
+        self.labels2 = labels2[keep_cols]
+        self.row_totals = row_totals[keep_rows].astype(np.int64)
+        self.col_totals = col_totals[keep_cols].astype(np.int64)
+        if self.sparse:
+            # Re-map codes onto the kept labels.
+            self.rows = (np.cumsum(keep_rows) - 1)[self.rows]
+            self.cols = (np.cumsum(keep_cols) - 1)[self.cols]
+        else:
+            self.matrix = matrix[np.ix_(keep_rows, keep_cols)]
+
+    @classmethod
+    def from_series(cls, s1, s2):
+        codes1, labels1 = factorize_column(s1)
+        codes2, labels2 = factorize_column(s2)
+        return cls(codes1, labels1, codes2, labels2)
+
+    def _frame(self, values):
+        if self.sparse:
+            return self._sparse_frame(values)
+        return pd.DataFrame(values, index=self.labels1, columns=self.labels2)
+
+    def _sparse_frame(self, values):
+        """Crosstab-shaped frame with one SparseArray column per label of the second column."""
+        n1 = len(self.labels1)
+        order = np.argsort(self.cols, kind="stable")
+        rows, values = self.rows[order], values[order]
+        bounds = np.searchsorted(self.cols[order], np.arange(len(self.labels2) + 1))
+        # One dense buffer reused per column; SparseArray keeps only the non-zero cells.
+        dense = np.zeros(n1, dtype=values.dtype)
+        columns = {}
+        for j in range(len(self.labels2)):
+            cells = slice(bounds[j], bounds[j + 1])
+            dense[rows[cells]] = values[cells]
+            columns[j] = pd.arrays.SparseArray(dense, fill_value=0)
+            dense[rows[cells]] = 0
+        frame = pd.DataFrame(columns, index=self.labels1)
+        frame.columns = self.labels2
+        return frame
+
+    def counts(self):
+        return self._frame(self.cell_counts if self.sparse else self.matrix)
+
+    def joint_probability(self):
+        """Counts divided by the total number of rows (including rows with missing values)."""
+        values = self.cell_counts if self.sparse else self.matrix
+        return self._frame(values / self.total_rows)
+
+    def conditional_probability(self):
+        """P(col1 | col2): each column of counts divided by its total."""
+        if self.sparse:
+            return self._frame(self.cell_counts / self.col_totals[self.cols])
+        return self._frame(self.matrix / self.col_totals)
+
+    def marginals(self):
+        """Row and column totals as Series."""
+        return (
+            pd.Series(self.row_totals, index=self.labels1),
+            pd.Series(self.col_totals, index=self.labels2),
+        )
+
+    def transpose(self):
+        """Same table with the two columns swapped."""
+        flipped = ContingencyTable.__new__(ContingencyTable)
+        flipped.total_rows = self.total_rows
+        flipped.sparse = self.sparse
+        flipped.labels1, flipped.labels2 = self.labels2, self.labels1
+        flipped.row_totals, flipped.col_totals = self.col_totals, self.row_totals
+        if self.sparse:
+            flipped.rows, flipped.cols, flipped.cell_counts = self.cols, self.rows, self.cell_counts
+        else:
+            flipped.matrix = self.matrix.T
+        return flipped
+
+    @property
+    def nbytes(self):
+        if self.sparse:
+            return int(self.rows.nbytes + self.cols.nbytes + self.cell_counts.nbytes)
+        return int(self.matrix.nbytes)
+
+
+class ContingencyIndex:
+    """
+    Precomputed count matrices for every pair of low-cardinality columns,
+    so any joint or conditional table among them is a dictionary lookup.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.cardinality = {}
+        self.skipped_pairs = []
+        self.truncated = False
+        self.nbytes = 0
+
+    def get(self, col1, col2):
+        if (col1, col2) in self.tables:
+            return self.tables[(col1, col2)]
+        if (col2, col1) in self.tables:
+            return self.tables[(col2, col1)].transpose()
+        return None
+
+    def report(self):
+        """
+        Indexed columns, pair count, memory used, pairs skipped for the memory cap and
+        whether the pair cap stopped the build early.
+        """
+        return {
+            "columns": dict(self.cardinality),
+            "pairs": len(self.tables),
+            "bytes": self.nbytes,
+            "skipped_pairs": list(self.skipped_pairs),
+            "truncated": self.truncated,
+        }
+
+
+def build_contingency_index(df, max_cardinality=50, memory_cap_bytes=64 * 1024 * 1024, max_pairs=None):
+    """
+    Index pairs of columns with at most max_cardinality distinct values, stopping after
+    max_pairs tables (None for no limit).
+    """
+    index = ContingencyIndex()
+    codes = {}
+    for col in df.columns:
+        # nunique is cheaper than factorizing high-cardinality columns we will not keep.
+        if df[col].nunique(dropna=True) <= max_cardinality:
+            codes[col] = factorize_column(df[col])
+            index.cardinality[col] = len(codes[col][1])
+
+    cols = list(codes)
+    for i, col1 in enumerate(cols):
+        for col2 in cols[i:]:
+            if max_pairs is not None and len(index.tables) >= max_pairs:
+                index.truncated = True
+                return index
+            codes1, labels1 = codes[col1]
+            codes2, labels2 = codes[col2]
+            estimate = len(labels1) * len(labels2) * 8
+            if index.nbytes + estimate > memory_cap_bytes:
+                index.skipped_pairs.append((col1, col2))
+                continue
+            table = ContingencyTable(codes1, labels1, codes2, labels2, total_rows=len(df))
+            index.tables[(col1, col2)] = table
+            index.nbytes += table.nbytes
+    return index
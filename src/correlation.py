@@ -0,0 +1,145 @@
+#%% IMPORTS
+import numpy as np
+import pandas as pd
+from src.cache import memoize
+
+# Bytes per chunk-sized float64 temporary in update(); it makes about five of them.
+CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def chunk_rows_for(n_columns, budget=CHUNK_BYTES):
+    """Rows per chunk so one (rows x n_columns) float64 array fits in budget bytes."""
+    return max(1, budget // (max(n_columns, 1) * 8))
+
+
+class CorrelationAccumulator:
+    """
+    One-pass Pearson correlation over row chunks with pairwise-complete observations,
+    matching DataFrame.corr(). Only p x p co-moment sums are kept, so memory does not
+    depend on the number of rows, and appended rows can be folded in with update().
+    Values are shifted by a per-column reference to avoid cancellation in the sums.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.shift = None
+        self.n = np.zeros((p, p))
+        self.sx = np.zeros((p, p))
+        self.sxx = np.zeros((p, p))
+        self.sxy = np.zeros((p, p))
+
+    def update(self, chunk):
+        """
+        Fold a chunk (DataFrame or 2D array with the same columns) into the sums. Chunks
+        longer than chunk_rows_for(p) are folded in slices to keep the temporaries bounded.
+        """
+        step = chunk_rows_for(len(self.columns))
+        if len(chunk) > step:
+            for start in range(0, len(chunk), step):
+                self.update(chunk[start:start + step] if not isinstance(chunk, pd.DataFrame)
+                            else chunk.iloc[start:start + step])
+            return self
+        if isinstance(chunk, pd.DataFrame):
+            x = chunk[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        else:
+            x = np.asarray(chunk, dtype="float64")
+        if x.shape[0] == 0:
+            return self
+        valid = ~np.isnan(x)
+        if self.shift is None:
+            counts = valid.sum(axis=0)
+            self.shift = np.where(counts > 0, np.nansum(x, axis=0) / np.maximum(counts, 1), 0.0)
+        m = valid.astype("float64")
+        d = np.where(valid, x - self.shift, 0.0)
+        self.n += m.T @ m
+        self.sx += d.T @ m
+        self.sxx += (d * d).T @ m
+        self.sxy += d.T @ d
+        return self
+
+    def update_frame(self, df, chunk_rows=None):
+        """
+        Fold a whole DataFrame in row slices so the float copy stays chunk-sized; by
+        default the slices are sized from CHUNK_BYTES and the number of columns.
+        """
+        chunk_rows = chunk_rows or chunk_rows_for(len(self.columns))
+        for start in range(0, len(df), chunk_rows):
+            self.update(df.iloc[start:start + chunk_rows])
+        return self
+
+    def _reshifted(self, new_shift):
+        """Sums re-expressed around another shift vector."""
+        delta = self.shift - new_shift
+        sx = self.sx + self.n * delta[:, None]
+        sxx = self.sxx + 2 * delta[:, None] * self.sx + self.n * (delta ** 2)[:, None]
+        sxy = (
+            self.sxy
+            + self.sx * delta[None, :]
+            + self.sx.T * delta[:, None]
+            + self.n * np.outer(delta, delta)
+        )
+        return sx, sxx, sxy
+
+    def merge(self, other):
+        """Combine with an accumulator over other rows of the same columns."""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge correlation accumulators over different columns.")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        sx, sxx, sxy = other._reshifted(self.shift)
+        self.n += other.n
+        self.sx += sx
+        self.sxx += sxx
+        self.sxy += sxy
+        return self
+
+    def corr(self):
+        """Correlation matrix as a DataFrame."""
+        n, sx = self.n, self.sx
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * self.sxy - sx * sx.T
+            var = n * self.sxx - sx * sx
+            corr = cov / np.sqrt(var * var.T)
+        corr = np.clip(corr, -1.0, 1.0)
+        # Constant or near-empty columns have no defined correlation.
+        corr[(n < 2) | (var <= 0) | (var.T <= 0)] = np.nan
+        np.fill_diagonal(corr, np.where(np.diag(n) > 1, 1.0, np.nan))
+        diag_var = np.diag(var)
+        corr[diag_var <= 0, :] = np.nan
+        corr[:, diag_var <= 0] = np.nan
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def top_correlated_pairs(corr, k=10):
+    """
+    The k distinct column pairs with the largest absolute correlation.
+    Uses argpartition over the upper triangle instead of sorting every pair.
+    """
+    values = corr.to_numpy() if isinstance(corr, pd.DataFrame) else np.asarray(corr)
+    names = list(corr.columns) if isinstance(corr, pd.DataFrame) else list(range(len(values)))
+    rows, cols = np.triu_indices(len(values), k=1)
+    pair_corr = values[rows, cols]
+    keep = ~np.isnan(pair_corr)
+    rows, cols, pair_corr = rows[keep], cols[keep], pair_corr[keep]
+    abs_corr = np.abs(pair_corr)
+    if len(abs_corr) > k:
+        part = np.argpartition(-abs_corr, k - 1)[:k]
+    else:
+        part = np.arange(len(abs_corr))
+    order = part[np.argsort(-abs_corr[part], kind="stable")]
+    return pd.DataFrame({
+        "column_1": [names[i] for i in rows[order]],
+        "column_2": [names[j] for j in cols[order]],
+        "corr": pair_corr[order],
+        "abs_corr": abs_corr[order],
+    })
+
+
+@memoize()
+def correlation_matrix(df, columns=None, chunk_rows=None):
+    """Correlation of numeric columns of an in-memory DataFrame, computed in row chunks."""
+    columns = columns or df.select_dtypes(include="number").columns.tolist()
+    return CorrelationAccumulator(columns).update_frame(df, chunk_rows).corr()
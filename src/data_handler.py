@@ -1,11 +1,25 @@
 #%% IMPORTS
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
+from src.config import CONFIG, plotting
+from src.chunked_csv import ChunkedCSVReader
+from src.decimate import decimate_line
+from src.kde import binned_kde, scott_bandwidth
+from src.query_index import QueryIndex
+from src.dataset_registry import REGISTRY
+from src.output_io import atomic_path
+from src.event_log import LOG
+from src.tracing import traced
+from src.cache import memoize
+import numpy as np
 
 
 
+@memoize()
+def crosstab_frame(data, col1, col2, normalize=False):
+    """pd.crosstab of two columns of data, memoized per dataset."""
+    return pd.crosstab(data[col1], data[col2], normalize=normalize)
+
+
 class DataVisualizer:
     """
     Parent class to store configurations and provide basic data visualization and querying.
@@ -14,23 +28,53 @@ class DataVisualizer:
 
         self.config = config if config else {}
         self.data = None
+        self.sketches = {}
 
     def set_data(self, data):
         """Set an in-memory DataFrame for plotting and queries."""
         self.data = data
 
+    def set_sketches(self, sketches):
+        """
+        Set per-column QuantileSketch objects (see src.sketch).
+        Box and violin plots of sketched columns are drawn from the sketch,
+        so they also work when the data is not in memory.
+        """
+        self.sketches = sketches or {}
+
+    def _option(self, key):
+        return self.config.get(key, CONFIG[key])
+
+    def _is_large(self, *columns):
+        """True when the columns are numeric and have more rows than the large-data threshold."""
+        return len(self.data) > self._option("LARGE_DATA_THRESHOLD") and all(
+            pd.api.types.is_numeric_dtype(self.data[c]) for c in columns
+        )
+
     def _save_fig(self, fig, save_path):
         if not save_path:
             return
-        out_dir = os.path.dirname(save_path) or "."
-        os.makedirs(out_dir, exist_ok=True)
-        fig.savefig(save_path, bbox_inches="tight")
+        with atomic_path(save_path) as tmp:
+            fig.savefig(tmp, bbox_inches="tight")
 
+    @traced(category="plot")
     def plot_histogram(self, column, show=True, save_path=None):
         """Plot histogram for a numeric column."""
+        plt, sns = plotting()
         if self.data is not None and column in self.data.columns:
             fig, ax = plt.subplots(figsize=(8, 5))
-            sns.histplot(self.data[column], kde=True, ax=ax)
+            values = self.data[column]
+            if pd.api.types.is_numeric_dtype(values) and values.count() > self._option("KDE_BINNED_THRESHOLD"):
+                # Binned FFT KDE instead of the exact O(n x grid) estimate.
+                values = values.dropna().to_numpy(dtype="float64")
+                edges = np.histogram_bin_edges(values, bins="auto")
+                sns.histplot(values, bins=edges, ax=ax)
+                grid, density = binned_kde(values)
+                color = ax.patches[0].get_facecolor()[:3] if ax.patches else None
+                ax.plot(grid, density * len(values) * (edges[1] - edges[0]), color=color)
+                ax.set_xlabel(column)
+            else:
+                sns.histplot(self.data[column], kde=True, ax=ax)
             ax.set_title(f'Histogram of {column}')
             self._save_fig(fig, save_path)
             if show:
@@ -40,11 +84,21 @@ class DataVisualizer:
             print(f"Column '{column}' not found or no data loaded.")
             return None
 
+    @traced(category="plot")
     def plot_line(self, x_column, y_column, show=True, save_path=None):
         """Plot line graph for numeric data."""
+        plt, _ = plotting()
         if self.data is not None and x_column in self.data.columns and y_column in self.data.columns:
             fig, ax = plt.subplots(figsize=(8, 5))
-            ax.plot(self.data[x_column], self.data[y_column], marker='o')
+            if self._is_large(x_column, y_column):
+                # Shape-preserving downsampling keeps render time flat in the row count.
+                pair = self.data[[x_column, y_column]].dropna()
+                x = pair[x_column].to_numpy()
+                y = pair[y_column].to_numpy()
+                idx = decimate_line(x, y, self._option("LINE_MAX_POINTS"), self._option("LINE_DECIMATION"))
+                ax.plot(x[idx], y[idx], linewidth=0.8)
+            else:
+                ax.plot(self.data[x_column], self.data[y_column], marker='o')
             ax.set_xlabel(x_column)
             ax.set_ylabel(y_column)
             ax.set_title(f'Line plot: {y_column} vs {x_column}')
@@ -56,7 +110,36 @@ class DataVisualizer:
             print("Columns not found or no data loaded.")
             return None
 
+    def _violin_from_sketch(self, ax, column):
+        _, sns = plotting()
+        sketch = self.sketches[column]
+        values, weights = sketch.items()
+        # Bandwidth follows the sketch's resolution, not the full row count.
+        bw = scott_bandwidth(values, weights)
+        grid = np.linspace(sketch.min - 2 * bw, sketch.max + 2 * bw, 200)
+        _, density = binned_kde(values, grid=grid, bw=bw, weights=weights)
+        half_width = density / density.max() * 0.4
+        color = sns.color_palette()[0]
+        ax.fill_betweenx(grid, -half_width, half_width, facecolor=color, edgecolor=".25", linewidth=1)
+        stats = sketch.box_stats()
+        ax.vlines(0, stats["whislo"], stats["whishi"], color=".25", linewidth=1.5)
+        ax.vlines(0, stats["q1"], stats["q3"], color=".25", linewidth=5)
+        ax.scatter([0], [stats["med"]], color="white", s=20, zorder=3)
+        ax.set_xlim(-0.5, 0.5)
+        ax.set_xticks([])
+        ax.set_ylabel(column)
+
+    @traced(category="plot")
     def plot_violin(self, column, show=True, save_path=None):
+        plt, sns = plotting()
+        if column in self.sketches:
+            fig, ax = plt.subplots(figsize=(8, 5))
+            self._violin_from_sketch(ax, column)
+            ax.set_title(f'Violin plot of {column}')
+            self._save_fig(fig, save_path)
+            if show:
+                plt.show()
+            return fig
         if self.data is not None and column in self.data.columns:
             fig, ax = plt.subplots(figsize=(8, 5))
             sns.violinplot(y=self.data[column], ax=ax)
@@ -69,7 +152,24 @@ class DataVisualizer:
             print(f"Column '{column}' not found or no data loaded.")
             return None
 
+    @traced(category="plot")
     def plot_box(self, column, show=True, save_path=None):
+        plt, sns = plotting()
+        if column in self.sketches:
+            fig, ax = plt.subplots(figsize=(8, 5))
+            ax.bxp(
+                [self.sketches[column].box_stats()],
+                patch_artist=True,
+                boxprops={"facecolor": sns.color_palette()[0]},
+                medianprops={"color": ".25"},
+            )
+            ax.set_xticks([])
+            ax.set_ylabel(column)
+            ax.set_title(f'Boxplot of {column}')
+            self._save_fig(fig, save_path)
+            if show:
+                plt.show()
+            return fig
         if self.data is not None and column in self.data.columns:
             fig, ax = plt.subplots(figsize=(8, 5))
             sns.boxplot(y=self.data[column], ax=ax)
@@ -82,10 +182,22 @@ class DataVisualizer:
             print(f"Column '{column}' not found or no data loaded.")
             return None
 
+    @traced(category="plot")
     def plot_scatter(self, x_column, y_column, show=True, save_path=None):
+        plt, sns = plotting()
         if self.data is not None and x_column in self.data.columns and y_column in self.data.columns:
             fig, ax = plt.subplots(figsize=(8, 5))
-            sns.scatterplot(x=self.data[x_column], y=self.data[y_column], ax=ax)
+            if self._is_large(x_column, y_column):
+                # Density raster instead of one marker per row.
+                pair = self.data[[x_column, y_column]].dropna()
+                gridsize = self._option("SCATTER_GRIDSIZE")
+                if self._option("SCATTER_MODE") == "hist2d":
+                    *_, image = ax.hist2d(pair[x_column], pair[y_column], bins=gridsize, cmin=1, cmap="viridis")
+                else:
+                    image = ax.hexbin(pair[x_column], pair[y_column], gridsize=gridsize, mincnt=1, cmap="viridis")
+                fig.colorbar(image, ax=ax, label="count")
+            else:
+                sns.scatterplot(x=self.data[x_column], y=self.data[y_column], ax=ax)
             ax.set_xlabel(x_column)
             ax.set_ylabel(y_column)
             ax.set_title(f'Scatter plot: {y_column} vs {x_column}')
@@ -97,10 +209,18 @@ class DataVisualizer:
             print("Columns not found or no data loaded.")
             return None
 
+    def _query_index(self):
+        """Column indexes for queries, rebuilt when self.data is replaced."""
+        index = getattr(self, "_index", None)
+        if index is None or index.df is not self.data:
+            index = QueryIndex(self.data)
+            self._index = index
+        return index
+
     def query_simple(self, column, value):
         """Return rows where column equals value (simple condition)."""
         if self.data is not None and column in self.data.columns:
-            result = self.data[self.data[column] == value]
+            result = self._query_index().query({column: value})
             return result
         else:
             print("Column not found or no data loaded.")
@@ -111,19 +231,63 @@ class CSVDataProcessor(DataVisualizer):
     """
     Child class to read CSV, store dataframe, use configuration, and provide advanced visualization.
     """
-    def __init__(self, csv_file, config=None):
+    def __init__(self, csv_file, config=None, chunksize=None, data=None):
         super().__init__(config)
         self.csv_file = csv_file
-        self.read_data()
+        self.chunksize = chunksize
+        self.reader = None
+        if data is not None:
+            # Already loaded (e.g. shared from the dataset registry).
+            self.data = data
+        else:
+            self.read_data()
 
     def read_data(self):
-        """Read CSV into dataframe."""
+        """
+        Read CSV into dataframe.
+        With a chunksize set, the file is streamed instead and self.data stays None;
+        use summary/crosstab/correlation, which work in both modes.
+        """
         try:
-            self.data = pd.read_csv(self.csv_file)
-            print(f"Data loaded successfully. Shape: {self.data.shape}")
+            if self.chunksize:
+                self.reader = ChunkedCSVReader(self.csv_file, chunksize=self.chunksize)
+                self.data = None
+                print(f"Streaming mode enabled. Columns: {len(self.reader.columns)}, chunk size: {self.chunksize}")
+            else:
+                self.data = REGISTRY.load(self.csv_file)
+                print(f"Data loaded successfully. Shape: {self.data.shape}")
         except Exception as e:
             print(f"Error loading data: {e}")
             self.data = None
+            self.reader = None
+
+    def summary(self):
+        """Numeric summary statistics (describe) for in-memory or streamed data."""
+        if self.reader is not None:
+            return self.reader.summary()
+        if self.data is None:
+            print("No data loaded.")
+            return pd.DataFrame()
+        return REGISTRY.describe(self.data)
+
+    def crosstab(self, col1, col2, normalize=False):
+        """Joint counts of two columns; normalize='columns' gives conditional probabilities."""
+        if self.reader is not None:
+            return self.reader.crosstab(col1, col2, normalize=normalize)
+        if self.data is None:
+            print("No data loaded.")
+            return pd.DataFrame()
+        return crosstab_frame(self.data, col1, col2, normalize)
+
+    def correlation(self, columns=None):
+        """Pearson correlation matrix of numeric columns."""
+        if self.reader is not None:
+            return self.reader.correlation(columns)
+        if self.data is None:
+            print("No data loaded.")
+            return pd.DataFrame()
+        numeric = self.data.select_dtypes(include="number")
+        return numeric[columns].corr() if columns else numeric.corr()
 
     def plot_histogram(self, column, show=True, save_path=None):
         """Override parent method to add basic logging."""
@@ -141,19 +305,15 @@ class CSVDataProcessor(DataVisualizer):
             print("No data loaded.")
             return pd.DataFrame()
 
-        df = self.data
+        valid = {}
         for col, val in conditions.items():
-            if col in df.columns:
-                if isinstance(val, list):
-                    df = df[df[col].isin(val)]
-                else:
-                    df = df[df[col] == val]
+            if col in self.data.columns:
+                valid[col] = val
             else:
                 print(f"Column '{col}' not found, skipping.")
-        return df
+        # The planner combines per-column bitmaps and takes the rows once.
+        return self._query_index().query(valid)
 
-    def log(self, message):
-        """Append messages to a log file in Output folder."""
-        os.makedirs("Output", exist_ok=True)
-        with open("Output/log.txt", "a") as f:
-            f.write(message + "\n")
+    def log(self, message, **fields):
+        """Record a message in the buffered JSON-lines log in the Output folder."""
+        LOG.info(message, source=type(self).__name__, **fields)
@@ -0,0 +1,81 @@
+#%% IMPORTS
+import os
+import threading
+import time
+
+import pandas as pd
+from src.columnar_store import load_dataset
+from src.summary import summary_table
+
+
+def describe_frame(data):
+    """data.describe() from the shared summary engine (memoized per dataset)."""
+    return summary_table(data)
+
+
+class DatasetRegistry:
+    """
+    Loads each dataset source once per process and hands the same frame to every caller.
+    Frames are shared, so callers must treat them as read-only.
+    Load time and memory are recorded per dataset.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _key(self, path, columns):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        # mtime and size in the key so an edited file is loaded again.
+        return (path, tuple(columns) if columns is not None else None, stat.st_mtime_ns, stat.st_size)
+
+    def load(self, path, columns=None):
+        """Return the shared frame for path (restricted to columns), loading it on first use."""
+        key = self._key(path, columns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                start = time.perf_counter()
+                data = load_dataset(path, columns=columns)
+                elapsed = time.perf_counter() - start
+                memory = int(data.memory_usage(deep=True).sum()) if isinstance(data, pd.DataFrame) else 0
+                entry = {
+                    "path": key[0],
+                    "columns": key[1],
+                    "data": data,
+                    "load_seconds": elapsed,
+                    "memory_bytes": memory,
+                    "requests": 0,
+                }
+                self._entries[key] = entry
+            entry["requests"] += 1
+            return entry["data"]
+
+    def describe(self, data):
+        """data.describe(), computed once per dataset."""
+        return describe_frame(data)
+
+    def report(self):
+        """One row per loaded dataset with shape, load time, memory and request count."""
+        rows = []
+        with self._lock:
+            for entry in self._entries.values():
+                data = entry["data"]
+                rows.append({
+                    "path": entry["path"],
+                    "columns": "all" if entry["columns"] is None else ",".join(entry["columns"]),
+                    "shape": getattr(data, "shape", None),
+                    "load_seconds": round(entry["load_seconds"], 4),
+                    "memory_mb": round(entry["memory_bytes"] / 1024 / 1024, 3),
+                    "requests": entry["requests"],
+                })
+        return pd.DataFrame(rows)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide registry used by the readers and the CLI.
+REGISTRY = DatasetRegistry()
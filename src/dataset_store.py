@@ -0,0 +1,256 @@
+#%% IMPORTS
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from src.cache import forget_dataset
+from src.columnar_store import read_columnar, write_columnar
+from src.config import CONFIG
+from src.event_log import LOG
+
+
+def resident_nbytes(data):
+    """Bytes a frame holds in process memory; memory-mapped columns are backed by the file."""
+    total = 0
+    usage = data.memory_usage(index=True, deep=True)
+    for name, nbytes in usage.items():
+        values = data.index.to_numpy() if name == "Index" else data[name].to_numpy()
+        base = values
+        while isinstance(base, np.ndarray) and not isinstance(base, np.memmap):
+            base = base.base
+        if not isinstance(base, np.memmap):
+            total += int(nbytes)
+    return total
+
+
+class DatasetLease:
+    """
+    One session's hold on a stored dataset. Released explicitly, or when the lease is
+    garbage collected with the session state that owns it.
+    """
+
+    def __init__(self, store, key):
+        self.key = key
+        self._finalizer = weakref.finalize(self, store.release, key)
+
+    def release(self):
+        self._finalizer()
+
+
+class DatasetStore:
+    """
+    Process-wide store of parsed datasets keyed by content hash, so every session that
+    uploads the same file shares one read-only frame. Resident frames count against a
+    global budget; past it, the least recently used datasets that no session holds are
+    spilled to a memory-mapped columnar copy under spill_dir and reloaded from it on the
+    next request. Spilling first drops the memoized results keyed on the dataset and
+    runs spill_hooks[name](key) so other holders (e.g. background refinements) let go.
+    """
+
+    def __init__(self, max_bytes, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), "visualizer-datasets")
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.spill_hooks = {}
+        self.hits = 0
+        self.misses = 0
+        self.spills = 0
+        self.reloads = 0
+        self.drops = 0
+        atexit.register(self._clear_spill)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, str(os.getpid()), f"{key}.cols")
+
+    @staticmethod
+    def _held_bytes(entry):
+        """Bytes of entry still in memory: its frame, or a spilled frame something else still holds."""
+        if entry["data"] is not None:
+            return entry["bytes"]
+        ref, nbytes = entry.get("lingering") or (None, 0)
+        return nbytes if ref is not None and ref() is not None else 0
+
+    def _resident_total(self):
+        return sum(self._held_bytes(e) for e in self._entries.values())
+
+    def get(self, key, loader):
+        """
+        The shared frame for key, calling loader() to parse it on first use. Concurrent
+        requests for the same key wait for one load. Non-DataFrame results are returned
+        without being stored.
+        """
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            data = self._lookup(key)
+            if data is not None:
+                return data
+            with self._lock:
+                self.misses += 1
+            start = time.perf_counter()
+            data = loader()
+            if not isinstance(data, pd.DataFrame):
+                return data
+            self._insert(key, data, time.perf_counter() - start)
+            return data
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            entry["last_used"] = time.time()
+            if entry["data"] is not None:
+                self.hits += 1
+                return entry["data"]
+        # Spilled: map the columnar copy back in (outside the lock; file reads can be slow).
+        try:
+            data = read_columnar(entry["path"], mmap=True)
+        except Exception as e:
+            with self._lock:
+                self._entries.pop(key, None)
+                self.drops += 1
+            LOG.error("dataset reload failed", source="dataset_store", key=key, error=str(e))
+            return None
+        with self._lock:
+            entry["data"] = data
+            entry["bytes"] = resident_nbytes(data)
+            self.reloads += 1
+        LOG.info("dataset reloaded", source="dataset_store", key=key, resident_bytes=entry["bytes"])
+        self._enforce_budget(keep=key)
+        return data
+
+    def _insert(self, key, data, load_seconds):
+        with self._lock:
+            self._entries[key] = {
+                "data": data,
+                "shape": data.shape,
+                "bytes": resident_nbytes(data),
+                "refs": 0,
+                "path": None,
+                "load_seconds": load_seconds,
+                "last_used": time.time(),
+            }
+        self._enforce_budget(keep=key)
+
+    def lease(self, key):
+        """Count a session as a holder of key until the returned lease is released."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["refs"] += 1
+        return DatasetLease(self, key)
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["refs"] > 0:
+                entry["refs"] -= 1
+        self._enforce_budget()
+
+    def _enforce_budget(self, keep=None):
+        """
+        Spill the coldest unheld datasets until the resident total fits the budget.
+        keep is the dataset just handed to a caller, which is about to be leased.
+        """
+        while True:
+            with self._lock:
+                if self._resident_total() <= self.max_bytes:
+                    return
+                victim = next((k for k, e in self._entries.items()
+                               if k != keep and e["data"] is not None and e["refs"] == 0 and e["bytes"] > 0),
+                              None)
+                if victim is None:
+                    # Everything resident is in use; stay over budget rather than pull frames from sessions.
+                    return
+                entry = self._entries[victim]
+                data = entry["data"]
+            ref = weakref.ref(data)
+            self._spill(victim, entry, data)
+            del data
+            if ref() is not None and entry["data"] is None:
+                # Something outside the store still holds the frame, so its memory isn't
+                # freed yet; keep counting it until it is collected.
+                with self._lock:
+                    entry["lingering"] = (ref, entry["bytes"])
+                LOG.error("spilled dataset still referenced", source="dataset_store", key=victim)
+
+    def _spill(self, key, entry, data):
+        path = entry["path"] or self._spill_path(key)
+        try:
+            if entry["path"] is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                write_columnar(data, path)
+        except Exception as e:
+            # No copy on disk: forget the dataset; the next upload parses it again.
+            with self._lock:
+                self._entries.pop(key, None)
+                self.drops += 1
+            LOG.error("dataset dropped", source="dataset_store", key=key, error=str(e))
+            return
+        forget_dataset(data)
+        for hook in list(self.spill_hooks.values()):
+            hook(key)
+        with self._lock:
+            entry["path"] = path
+            entry["data"] = None
+            self.spills += 1
+        LOG.info("dataset spilled", source="dataset_store", key=key, bytes=entry["bytes"], path=path)
+
+    def stats(self):
+        with self._lock:
+            resident = [e for e in self._entries.values() if e["data"] is not None]
+            return {
+                "datasets": len(self._entries),
+                "resident": len(resident),
+                "spilled": len(self._entries) - len(resident),
+                "bytes": sum(self._held_bytes(e) for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "spills": self.spills,
+                "reloads": self.reloads,
+                "drops": self.drops,
+            }
+
+    def report(self):
+        """One row per stored dataset, most recently used last."""
+        rows = []
+        with self._lock:
+            for key, e in self._entries.items():
+                rows.append({
+                    "key": key[:12],
+                    "shape": e["shape"],
+                    "state": "memory" if e["data"] is not None else "spilled",
+                    "resident_mb": round(e["bytes"] / 1024 / 1024, 3) if e["data"] is not None else 0.0,
+                    "sessions": e["refs"],
+                    "load_seconds": round(e["load_seconds"], 4),
+                    "last_used": time.strftime("%H:%M:%S", time.localtime(e["last_used"])),
+                })
+        return pd.DataFrame(rows, columns=["key", "shape", "state", "resident_mb", "sessions",
+                                           "load_seconds", "last_used"])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._clear_spill()
+
+    def _clear_spill(self):
+        shutil.rmtree(os.path.join(self.spill_dir, str(os.getpid())), ignore_errors=True)
+
+
+# Process-wide store shared by every Streamlit session.
+DATASET_STORE = DatasetStore(
+    max_bytes=CONFIG["DATASET_STORE_MB"] * 1024 * 1024,
+    spill_dir=CONFIG["DATASET_SPILL_DIR"],
+)
@@ -0,0 +1,60 @@
+#%% IMPORTS
+import numpy as np
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Row indices keeping the min and max of y in each of n_buckets consecutive buckets.
+    Preserves the visual envelope of a line drawn in row order. y must not contain NaN.
+    """
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    keep = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        seg = y[start:end]
+        i_lo = start + int(np.argmin(seg))
+        i_hi = start + int(np.argmax(seg))
+        keep.extend(sorted({i_lo, i_hi}))
+    return np.asarray(keep, dtype=np.int64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling; returns the indices of the kept points.
+    x is expected to be sorted (row position is used when it is not). y must not contain NaN.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    if np.any(np.diff(x) < 0):
+        x = np.arange(n, dtype="float64")
+
+    # n_out - 2 buckets between the fixed first and last points.
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.int64), n)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        nxt_start, nxt_end = edges[b + 1], edges[b + 2]
+        avg_x = x[nxt_start:nxt_end].mean()
+        avg_y = y[nxt_start:nxt_end].mean()
+        seg_x = x[start:end]
+        seg_y = y[start:end]
+        area = np.abs((x[prev] - avg_x) * (seg_y - y[prev]) - (x[prev] - seg_x) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        keep[b + 1] = prev
+    return keep
+
+
+def decimate_line(x, y, n_out, method="lttb"):
+    """Indices for drawing x/y as a line with about n_out points."""
+    if method == "minmax":
+        return minmax_indices(y, max(n_out // 2, 1))
+    return lttb_indices(x, y, n_out)
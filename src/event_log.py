@@ -0,0 +1,147 @@
+#%% IMPORTS
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from multiprocessing import util as mp_util
+
+from src.config import CONFIG
+
+
+class BufferedJSONLogger:
+    """
+    Collects log records in memory and appends them as JSON lines in batches.
+    A batch is written when it reaches max_records or max_bytes, every flush_seconds
+    from a background thread, and at interpreter or worker-process exit.
+    Each batch is a single O_APPEND write per file, so records from threads and
+    processes sharing a file never interleave mid-line.
+    """
+
+    def __init__(self, filename=None, max_records=None, max_bytes=1 << 20, flush_seconds=None, directory=None):
+        self.filename = filename or CONFIG["LOG_FILE"]
+        # Fixed log folder; None follows CONFIG['OUTPUT_DIR'].
+        self.directory = directory
+        self.max_records = max_records or CONFIG["LOG_BUFFER_RECORDS"]
+        self.max_bytes = max_bytes
+        self.flush_seconds = flush_seconds if flush_seconds is not None else CONFIG["LOG_FLUSH_SECONDS"]
+        self._local = threading.local()
+        self._reset()
+
+    def _reset(self):
+        # Also used in a forked child, where the parent's buffer and thread don't carry over.
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _directory(self):
+        # Resolved per record: the batch runner points OUTPUT_DIR at a new folder per dataset.
+        return self.directory or CONFIG["OUTPUT_DIR"]
+
+    def _start_timer(self):
+        if self._thread is None and self.flush_seconds > 0:
+            self._thread = threading.Thread(target=self._flush_loop, name="log-flush", daemon=True)
+            self._thread.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    @property
+    def current_stage(self):
+        return getattr(self._local, "stage", None)
+
+    def log(self, message, level="info", **fields):
+        """Buffer one record; extra keyword fields are stored alongside the message."""
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "level": level,
+            "pid": os.getpid(),
+            "stage": fields.pop("stage", self.current_stage),
+            "message": str(message),
+        }
+        record.update(fields)
+        line = json.dumps(record, default=str) + "\n"
+        out_dir = self._directory()
+        with self._lock:
+            self._start_timer()
+            self._buffer.append((out_dir, line))
+            self._buffer_bytes += len(line)
+            full = len(self._buffer) >= self.max_records or self._buffer_bytes >= self.max_bytes
+        if full:
+            self.flush()
+
+    def info(self, message, **fields):
+        self.log(message, level="info", **fields)
+
+    def error(self, message, **fields):
+        self.log(message, level="error", **fields)
+
+    def flush(self):
+        """Write every buffered record to its file."""
+        with self._lock:
+            batch, self._buffer, self._buffer_bytes = self._buffer, [], 0
+            by_dir = {}
+            for out_dir, line in batch:
+                by_dir.setdefault(out_dir, []).append(line)
+            for out_dir, lines in by_dir.items():
+                os.makedirs(out_dir, exist_ok=True)
+                fd = os.open(os.path.join(out_dir, self.filename), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, "".join(lines).encode("utf-8"))
+                finally:
+                    os.close(fd)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """Tag records from this thread with a stage name and log the stage's duration at exit."""
+        previous = self.current_stage
+        self._local.stage = name
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield self
+        except Exception:
+            status = "failed"
+            raise
+        finally:
+            self.log("stage finished", stage=name, status=status,
+                     duration_s=round(time.perf_counter() - start, 6), **fields)
+            self._local.stage = previous
+
+
+class LogList(list):
+    """A list that also forwards every appended message to the shared log."""
+
+    def __init__(self, *args, source=None):
+        super().__init__(*args)
+        self.source = source
+
+    def append(self, item):
+        super().append(item)
+        LOG.info(item, source=self.source)
+
+
+# Process-wide logger shared by the processors, the pipeline and module_tmp.
+LOG = BufferedJSONLogger()
+
+
+def _flush_at_process_exit(logger):
+    # multiprocessing children leave through os._exit, which skips atexit, but they
+    # still run the finalizers registered after their start-up.
+    mp_util.Finalize(logger, logger.flush, exitpriority=10)
+
+
+os.register_at_fork(after_in_child=LOG._reset)
+# Also registered now, for worker processes that import this module after they start.
+_flush_at_process_exit(LOG)
+mp_util.register_after_fork(LOG, _flush_at_process_exit)
+atexit.register(LOG.close)
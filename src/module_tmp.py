@@ -1,26 +1,75 @@
-import os
 import numpy as np
 import pandas as pd
+from src.cache import MemoCache
+from src.config import CONFIG
+from src.output_io import atomic_path
+from src.event_log import LogList
 
 # Global immutable constant (tuple)
 DEFAULT_SHAPE = (3, 4)
 
-# Global mutable container
-GLOBAL_LOG = []
-
-
-def make_numpy_dataframe(rows, cols, start=0):
-    """Create a NumPy m x n array and write it into a DataFrame."""
-    arr = np.arange(start, start + rows * cols).reshape(rows, cols)
-    df = pd.DataFrame(arr, columns=[f"c{i}" for i in range(cols)])
+# Global mutable container; appended messages also go to the shared JSON log
+GLOBAL_LOG = LogList(source="module_tmp")
+
+
+def make_numpy_dataframe(rows, cols, start=0, random=False, categorical=0, cardinality=10,
+                         null_rate=0.0, seed=None):
+    """
+    Create a NumPy m x n array and write it into a DataFrame.
+    With the defaults the numeric columns c0..c{n-1} hold start, start + 1, ... row by row.
+    random=True draws them from mixed distributions instead; categorical adds that many
+    category columns k0.. with `cardinality` skewed labels each (an int, or one per
+    column, raising ValueError if the count differs); null_rate blanks that fraction
+    of every column.
+    """
+    rng = np.random.default_rng(seed)
+    if random:
+        data = {}
+        for i in range(cols):
+            kind = i % 4
+            if kind == 0:
+                data[f"c{i}"] = rng.normal(50.0, 15.0, rows)
+            elif kind == 1:
+                data[f"c{i}"] = rng.lognormal(1.5, 0.8, rows)
+            elif kind == 2:
+                data[f"c{i}"] = rng.integers(2000, 2025, rows)
+            else:
+                data[f"c{i}"] = rng.exponential(30_000.0, rows)
+        df = pd.DataFrame(data)
+    else:
+        arr = np.arange(start, start + rows * cols).reshape(rows, cols)
+        df = pd.DataFrame(arr, columns=[f"c{i}" for i in range(cols)])
+
+    cards = [cardinality] * categorical if np.isscalar(cardinality) else list(cardinality)
+    if len(cards) != categorical:
+        raise ValueError(f"cardinality has {len(cards)} entries for {categorical} categorical columns.")
+    for j, card in enumerate(cards):
+        # Zipf-like frequencies: a few common labels and a long tail.
+        weights = 1.0 / np.arange(1, card + 1)
+        weights /= weights.sum()
+        codes = rng.choice(card, size=rows, p=weights)
+        labels = [f"k{j}_{v}" for v in range(card)]
+        df[f"k{j}"] = pd.Categorical.from_codes(codes, categories=labels)
+
+    if null_rate > 0:
+        for col in df.columns:
+            mask = rng.random(rows) < null_rate
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                codes = df[col].cat.codes.to_numpy().copy()
+                codes[mask] = -1
+                df[col] = pd.Categorical.from_codes(codes, dtype=df[col].dtype)
+            else:
+                values = df[col].to_numpy(dtype="float64", copy=True)
+                values[mask] = np.nan
+                df[col] = values
     return df
 
 
 def export_dataframe_pickle(df, path):
     """Export a DataFrame to a pickle file with basic error handling."""
     try:
-        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        df.to_pickle(path)
+        with atomic_path(path) as tmp_path:
+            df.to_pickle(tmp_path)
         return True
     except Exception as exc:
         GLOBAL_LOG.append(f"Pickle export failed: {exc}")
@@ -61,14 +110,15 @@ def make_counter():
     return inc
 
 
-class TempCache:
-    """Simple cache class with private-like variable."""
-
-    def __init__(self):
-        self._cache = {}
-
-    def set(self, key, value):
-        self._cache[key] = value
+class TempCache(MemoCache):
+    """
+    Bounded memo cache with private-like state: LRU and TTL eviction, byte accounting,
+    optional disk spill and hit/miss stats (see src.cache.MemoCache and memoize).
+    """
 
-    def get(self, key, default=None):
-        return self._cache.get(key, default)
+    def __init__(self, max_bytes=None, ttl=None, spill_dir=None):
+        super().__init__(
+            max_bytes if max_bytes is not None else CONFIG["ANALYTICS_CACHE_MB"] * 1024 * 1024,
+            ttl=ttl,
+            spill_dir=spill_dir,
+        )
@@ -0,0 +1,39 @@
+#%% IMPORTS
+import os
+import threading
+from contextlib import contextmanager
+
+from src.config import CONFIG
+
+
+def output_path(filename):
+    """Path of an artifact inside the configured output folder (created if needed)."""
+    out_dir = CONFIG["OUTPUT_DIR"]
+    os.makedirs(out_dir, exist_ok=True)
+    return os.path.join(out_dir, filename)
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yield a temporary path next to path and move it into place on success,
+    so readers and concurrent writers never see a half-written file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    root, ext = os.path.splitext(path)
+    # Keep the extension so writers that infer the format (savefig) still work.
+    tmp_path = f"{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@contextmanager
+def atomic_open(path, mode="w"):
+    """open() counterpart of atomic_path."""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode) as f:
+            yield f
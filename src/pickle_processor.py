@@ -1,34 +1,42 @@
 import pandas as pd
-import pickle
-import os
+from src.columnar_store import is_columnar
+from src.dataset_registry import REGISTRY
+from src.output_io import atomic_path, output_path
+from src.summary import compute_summary
 
 class PickleProcessor:
-    def __init__(self, pickle_file):
+    def __init__(self, pickle_file, data=None):
         self.pickle_file = pickle_file
-        self.data = None
+        self.data = data
 
-    def read_pickle(self):
+    def read_pickle(self, columns=None):
         try:
-            with open(self.pickle_file, "rb") as f:
-                self.data = pickle.load(f)
-            print(f"Pickle loaded successfully. Shape: {self.data.shape}")
+            self.data = REGISTRY.load(self.pickle_file, columns=columns)
+            kind = "Columnar dataset" if is_columnar(self.pickle_file) else "Pickle"
+            print(f"{kind} loaded successfully. Shape: {self.data.shape}")
         except Exception as e:
             print(f"Error loading pickle: {e}")
 
     def show_summary(self):
         if isinstance(self.data, pd.DataFrame):
+            describe = REGISTRY.describe(self.data)
             print("\n=== Summary Statistics ===")
-            print(self.data.describe())
-            mean_vals = self.data.mean(numeric_only=True)
-            median_vals = self.data.median(numeric_only=True)
-            std_vals = self.data.std(numeric_only=True)
-            summary = pd.DataFrame({"Mean": mean_vals, "Median": median_vals, "Std": std_vals})
+            print(describe)
+            # Same cached result describe came from; no extra passes over the data.
+            stats = compute_summary(self.data)
+            if stats is not None:
+                summary = stats.mean_median_std()
+            else:
+                summary = pd.DataFrame(columns=["Mean", "Median", "Std"])
             print("\n=== Mean / Median / Std ===")
             print(summary)
-            os.makedirs("Output", exist_ok=True)
-            self.data.describe().to_csv("Output/pickle_summary.csv", index=False)
-            summary.to_csv("Output/pickle_mean_median_std.csv")
-            print("Summary exported to Output/pickle_summary.csv")
-            print("Mean/Median/Std exported to Output/pickle_mean_median_std.csv")
+            summary_path = output_path("pickle_summary.csv")
+            stats_path = output_path("pickle_mean_median_std.csv")
+            with atomic_path(summary_path) as tmp:
+                describe.to_csv(tmp, index=False)
+            with atomic_path(stats_path) as tmp:
+                summary.to_csv(tmp)
+            print(f"Summary exported to {summary_path}")
+            print(f"Mean/Median/Std exported to {stats_path}")
         else:
             print("No valid DataFrame loaded.")
@@ -0,0 +1,168 @@
+#%% IMPORTS
+import io
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stdout
+
+import pandas as pd
+from src.event_log import LOG
+from src.tracing import TRACER
+
+
+class Stage:
+    """One step of the pipeline: func(ctx) runs after every stage named in deps succeeded."""
+
+    def __init__(self, name, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+
+
+# Set in each worker by _init_worker (inherited as-is under fork).
+_WORKER_STAGES = {}
+_WORKER_CTX = {}
+
+
+def use_agg_backend():
+    """Make figures render headless (Agg) without importing matplotlib if it isn't loaded yet."""
+    os.environ["MPLBACKEND"] = "Agg"
+    if "matplotlib" in sys.modules:
+        sys.modules["matplotlib"].use("Agg")
+
+
+def _init_worker(stages, ctx):
+    global _WORKER_STAGES, _WORKER_CTX
+    # Workers never show figures; Agg renders straight to files.
+    use_agg_backend()
+    _WORKER_STAGES = stages
+    _WORKER_CTX = ctx
+
+
+def _execute(stage, ctx):
+    """Run one stage with stdout captured; returns (output, seconds, error)."""
+    buffer = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    with redirect_stdout(buffer):
+        try:
+            with LOG.stage(stage.name), TRACER.section(stage.name, "stage"):
+                stage.func(ctx)
+        except Exception:
+            error = traceback.format_exc()
+            LOG.error(error.strip().splitlines()[-1], stage=stage.name)
+    return buffer.getvalue(), time.perf_counter() - start, error
+
+
+def warm_matplotlib():
+    """Render one tiny figure in the parent so forked workers inherit loaded fonts and caches."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(1, 1))
+    FigureCanvasAgg(fig)
+    fig.add_subplot().plot([0, 1], [0, 1])
+    fig.savefig(io.BytesIO(), format="png")
+
+
+def _run_in_worker(name):
+    result = _execute(_WORKER_STAGES[name], _WORKER_CTX)
+    # Workers can sit idle until the pool shuts down; don't hold finished stages' records.
+    LOG.flush()
+    # Trace events go back to the parent so one trace covers every process.
+    return result + (TRACER.drain(),)
+
+
+def _check(stages):
+    names = set()
+    for stage in stages:
+        if stage.name in names:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        missing = [dep for dep in stage.deps if dep not in names]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on undeclared stage(s): {missing}")
+        names.add(stage.name)
+
+
+def _pool_context():
+    # fork shares the already-loaded data with the workers without pickling it.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else None)
+
+
+def run_stages(stages, ctx, jobs=1, preload=()):
+    """
+    Run stages (declared in dependency order) serially or on a pool of jobs processes.
+    preload callables run in the parent before the pool forks (e.g. warm_matplotlib).
+    Each stage's output is printed in declaration order; a failed stage skips its dependents.
+    Returns a DataFrame with the status and wall time of every stage.
+    """
+    _check(stages)
+    results = {}
+
+    def finish(stage, output, seconds, error):
+        status = "failed" if error else "ok"
+        results[stage.name] = {"stage": stage.name, "status": status, "seconds": round(seconds, 4),
+                               "output": output, "error": error}
+
+    def blocked(stage):
+        return any(results.get(dep, {}).get("status") != "ok" for dep in stage.deps)
+
+    def skip(stage):
+        results[stage.name] = {"stage": stage.name, "status": "skipped", "seconds": 0.0,
+                               "output": "", "error": None}
+
+    printed = 0
+
+    def flush():
+        # Print finished stages in declaration order, stopping at the first pending one.
+        nonlocal printed
+        while printed < len(stages) and stages[printed].name in results:
+            result = results[stages[printed].name]
+            if result["output"]:
+                print(result["output"], end="")
+            if result["error"]:
+                print(f"Stage {result['stage']} failed:\n{result['error']}")
+            printed += 1
+
+    if jobs <= 1:
+        for stage in stages:
+            if blocked(stage):
+                skip(stage)
+            else:
+                finish(stage, *_execute(stage, ctx))
+            flush()
+    else:
+        by_name = {stage.name: stage for stage in stages}
+        for func in preload:
+            func()
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=_pool_context(),
+                                 initializer=_init_worker, initargs=(by_name, ctx)) as pool:
+            pending = list(stages)
+            running = {}
+            while pending or running:
+                for stage in list(pending):
+                    if not all(dep in results for dep in stage.deps):
+                        continue
+                    pending.remove(stage)
+                    if blocked(stage):
+                        skip(stage)
+                    else:
+                        running[pool.submit(_run_in_worker, stage.name)] = stage
+                flush()
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        output, seconds, error, events = future.result()
+                        TRACER.extend(events)
+                        finish(stage, output, seconds, error)
+                    except Exception:
+                        finish(stage, "", 0.0, traceback.format_exc())
+            flush()
+
+    return pd.DataFrame([results[stage.name] for stage in stages])[["stage", "status", "seconds"]]
@@ -0,0 +1,173 @@
+#%% IMPORTS
+import numpy as np
+import pandas as pd
+from src.contingency import factorize_column
+
+# Columns with at most this many distinct values get a bitmap index;
+# other numeric columns get a sorted index.
+BITMAP_MAX_CARDINALITY = 10_000
+
+
+class BitmapIndex:
+    """Equality index over categorical codes; one packed bitset per queried value, built lazily."""
+
+    def __init__(self, series):
+        self.n = len(series)
+        self.is_bool = pd.api.types.is_bool_dtype(series.dtype)
+        self.codes, self.labels = factorize_column(series)
+        self.counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.labels))
+        self._bitmaps = {}
+
+    def _code(self, value):
+        """Category code of value; -1 for missing, -2 when the value never occurs."""
+        if np.ndim(value) == 0 and pd.isna(value):
+            return -1
+        if self.is_bool and isinstance(value, (int, float, np.number)) and value in (0, 1):
+            # Match == on a bool column, where 1 == True and 0 == False.
+            value = bool(value)
+        try:
+            code = int(self.labels.get_indexer([value])[0])
+        except (TypeError, ValueError):
+            return -2
+        return code if code >= 0 else -2
+
+    def estimate(self, value):
+        """Number of rows equal to value."""
+        code = self._code(value)
+        if code == -1:
+            return int((self.codes == -1).sum())
+        return int(self.counts[code]) if code >= 0 else 0
+
+    def bitmap(self, value):
+        code = self._code(value)
+        if code == -2 or (code >= 0 and self.counts[code] == 0):
+            return None
+        if code not in self._bitmaps:
+            self._bitmaps[code] = np.packbits(self.codes == code)
+        return self._bitmaps[code]
+
+
+class SortedIndex:
+    """
+    Equality index for high-cardinality numeric columns via binary search. Values are
+    sorted in the column's own dtype so large integers compare exactly, as == does.
+    """
+
+    def __init__(self, series):
+        dtype = series.dtype
+        self.dtype = getattr(dtype, "numpy_dtype", dtype)
+        self.n = len(series)
+        missing = series.isna().to_numpy()
+        valid = np.flatnonzero(~missing)
+        values = series.iloc[valid].to_numpy(dtype=self.dtype)
+        order = np.argsort(values, kind="stable")
+        self.rows = valid[order]
+        self.sorted_values = values[order]
+        self.nan_rows = np.flatnonzero(missing)
+
+    def _range(self, value):
+        """Positions in sorted_values equal to value under ==; (0, 0) if no value can match."""
+        if not isinstance(value, (int, float, np.number)) or isinstance(value, np.complexfloating):
+            return 0, 0
+        if self.dtype.kind in "iu":
+            if isinstance(value, (float, np.floating)):
+                if abs(value) >= 2 ** 53:
+                    # == compares as float64 here, where neighbouring integers round together.
+                    equal = self.sorted_values.astype("float64") == value
+                    lo = int(np.argmax(equal))
+                    return lo, lo + int(equal.sum())
+                if not float(value).is_integer():
+                    return 0, 0
+            info = np.iinfo(self.dtype)
+            if not info.min <= int(value) <= info.max:
+                return 0, 0
+            key = np.array(int(value), dtype=self.dtype)
+        else:
+            key = np.array(value).astype(self.dtype)
+        lo = np.searchsorted(self.sorted_values, key, side="left")
+        hi = np.searchsorted(self.sorted_values, key, side="right")
+        return lo, hi
+
+    def estimate(self, value):
+        if np.ndim(value) == 0 and pd.isna(value):
+            return len(self.nan_rows)
+        lo, hi = self._range(value)
+        return int(hi - lo)
+
+    def bitmap(self, value):
+        if np.ndim(value) == 0 and pd.isna(value):
+            rows = self.nan_rows
+        else:
+            lo, hi = self._range(value)
+            rows = self.rows[lo:hi]
+        if not len(rows):
+            return None
+        mask = np.zeros(self.n, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+
+class QueryIndex:
+    """
+    Per-column indexes over a DataFrame plus a small planner for equality/isin conditions.
+    Masks are combined as packed bitsets, most selective first, and rows are taken once.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.n = len(df)
+        self._indexes = {}
+
+    def column_index(self, col):
+        if col not in self._indexes:
+            series = self.df[col]
+            if pd.api.types.is_numeric_dtype(series) and series.nunique() > BITMAP_MAX_CARDINALITY:
+                self._indexes[col] = SortedIndex(series)
+            else:
+                self._indexes[col] = BitmapIndex(series)
+        return self._indexes[col]
+
+    def _condition_bitmap(self, col, value):
+        index = self.column_index(col)
+        if isinstance(value, list):
+            # isin: OR of the per-value bitmaps (NaN only matches when listed, like isin).
+            result = None
+            for v in value:
+                b = index.bitmap(v)
+                if b is not None:
+                    result = b.copy() if result is None else result | b
+            return result
+        if np.ndim(value) == 0 and pd.isna(value):
+            # == NaN never matches.
+            return None
+        return index.bitmap(value)
+
+    def _estimate(self, col, value):
+        index = self.column_index(col)
+        if isinstance(value, list):
+            return sum(index.estimate(v) for v in value)
+        return index.estimate(value)
+
+    def plan(self, conditions):
+        """Conditions ordered by estimated number of matching rows (smallest first)."""
+        steps = [(self._estimate(col, val), col, val) for col, val in conditions.items()]
+        return sorted(steps, key=lambda step: step[0])
+
+    def mask(self, conditions):
+        """Boolean row mask for all conditions combined with AND."""
+        packed = None
+        for estimate, col, val in self.plan(conditions):
+            bitmap = None if estimate == 0 else self._condition_bitmap(col, val)
+            if bitmap is None:
+                return np.zeros(self.n, dtype=bool)
+            packed = bitmap.copy() if packed is None else np.bitwise_and(packed, bitmap, out=packed)
+            if not packed.any():
+                return np.zeros(self.n, dtype=bool)
+        if packed is None:
+            return np.ones(self.n, dtype=bool)
+        return np.unpackbits(packed, count=self.n).astype(bool)
+
+    def query(self, conditions):
+        if not conditions:
+            return self.df
+        return self.df[self.mask(conditions)]
@@ -0,0 +1,152 @@
+#%% IMPORTS
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 200
+# Each lower level holds this fraction of the level above it (KLL).
+LEVEL_DECAY = 2.0 / 3.0
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL quantile sketch with NumPy-batched updates.
+    Rank error is roughly 1/k of the count; count, min, max, mean and std are exact.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * LEVEL_DECAY ** depth)))
+
+    def _moments_update(self, n, mean, m2):
+        # Chan et al. parallel update of count, mean and sum of squared deviations.
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def update(self, values):
+        """Add a batch of values; NaNs are ignored."""
+        values = np.asarray(values, dtype="float64").ravel()
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return self
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        batch_mean = values.mean()
+        self._moments_update(values.size, batch_mean, float(((values - batch_mean) ** 2).sum()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        if other.count == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._moments_update(other.count, other.mean, other.m2)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so weights stay exact.
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[int(self._rng.integers(2))::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def items(self):
+        """Retained values and their weights, sorted by value."""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], weights[order]
+
+    def quantile(self, q):
+        """Approximate quantile(s) for q in [0, 1]."""
+        q = np.asarray(q, dtype="float64")
+        if self.count == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        values, weights = self.items()
+        # Midpoint rank of each retained item, scaled to [0, 1].
+        ranks = (np.cumsum(weights) - weights / 2) / weights.sum()
+        result = np.interp(q, ranks, values)
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return result if q.ndim else float(result)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    @property
+    def nbytes(self):
+        return int(sum(items.nbytes for items in self.levels))
+
+    def describe(self, percentiles=(0.25, 0.5, 0.75)):
+        """Series shaped like Series.describe() for a numeric column."""
+        stats = {"count": float(self.count), "mean": self.mean if self.count else np.nan, "std": self.std,
+                 "min": self.min if self.count else np.nan}
+        for p, value in zip(percentiles, np.atleast_1d(self.quantile(percentiles))):
+            stats[f"{p * 100:g}%"] = value
+        stats["max"] = self.max if self.count else np.nan
+        return pd.Series(stats)
+
+    def box_stats(self, label="", whis=1.5, max_fliers=500):
+        """Statistics for Axes.bxp: quartiles, whiskers and a sample of outliers."""
+        q1, med, q3 = self.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        lo_bound, hi_bound = q1 - whis * iqr, q3 + whis * iqr
+        values, weights = self.items()
+        inside = values[(values >= lo_bound) & (values <= hi_bound)]
+        whislo = self.min if self.min >= lo_bound else (inside.min() if inside.size else q1)
+        whishi = self.max if self.max <= hi_bound else (inside.max() if inside.size else q3)
+        # min and max are exact, so they are always shown when they fall outside the whiskers.
+        candidates = np.concatenate([values, [self.min, self.max]])
+        fliers = np.unique(candidates[(candidates < lo_bound) | (candidates > hi_bound)])
+        if fliers.size > max_fliers:
+            fliers = fliers[np.linspace(0, fliers.size - 1, max_fliers).astype(np.int64)]
+        return {"label": label, "med": med, "q1": q1, "q3": q3, "whislo": whislo, "whishi": whishi, "fliers": fliers}
+
+
+def build_sketches(data, columns=None, k=DEFAULT_K):
+    """
+    One sketch per numeric column from a DataFrame or an iterable of DataFrame chunks.
+    """
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    sketches = None
+    for chunk in chunks:
+        if sketches is None:
+            columns = columns or chunk.select_dtypes(include="number").columns.tolist()
+            sketches = {col: QuantileSketch(k=k, seed=i) for i, col in enumerate(columns)}
+        for col in columns:
+            sketches[col].update(chunk[col].to_numpy(dtype="float64", na_value=np.nan))
+    return sketches or {}
+
+
+def sketch_summary(sketches):
+    """describe()-style table for all sketched columns."""
+    return pd.DataFrame({col: sketch.describe() for col, sketch in sketches.items()})
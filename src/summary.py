@@ -0,0 +1,151 @@
+#%% IMPORTS
+import numpy as np
+import pandas as pd
+from src.cache import memoize
+from src.config import CONFIG
+
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75)
+# Rows of deviations materialized at a time for the standard deviation.
+STD_BLOCK_ROWS = 65_536
+
+
+class SummaryStats:
+    """Per-column count, mean, std, min, max and quantiles for the numeric columns of a frame."""
+
+    def __init__(self, columns, count, mean, std, minimum, maximum, quantiles, exact=True):
+        self.columns = columns
+        self.count = count
+        self.mean = mean
+        self.std = std
+        self.min = minimum
+        self.max = maximum
+        # {q: array of per-column values}; always contains the median (0.5).
+        self.quantiles = quantiles
+        self.exact = exact
+
+    @property
+    def median(self):
+        return self.quantiles[0.5]
+
+    @property
+    def nbytes(self):
+        return int(sum(a.nbytes for a in (self.count, self.mean, self.std, self.min, self.max))
+                   + sum(a.nbytes for a in self.quantiles.values()))
+
+    def describe(self, percentiles=DEFAULT_PERCENTILES):
+        """Table shaped like DataFrame.describe() for the numeric columns."""
+        rows = {"count": self.count.astype("float64"), "mean": self.mean, "std": self.std, "min": self.min}
+        for p in percentiles:
+            rows[f"{p * 100:g}%"] = self.quantiles[p]
+        rows["max"] = self.max
+        return pd.DataFrame(rows, index=self.columns).T
+
+    def mean_median_std(self):
+        """Mean / Median / Std per column, as PickleProcessor exports it."""
+        return pd.DataFrame({"Mean": self.mean, "Median": self.median, "Std": self.std}, index=self.columns)
+
+
+def _float_block(numeric, order):
+    """Columns of numeric, in order, copied into one C-contiguous (n_columns, n_rows) float64 block."""
+    block = np.empty((len(order), numeric.shape[0]), dtype="float64")
+    for i, j in enumerate(order):
+        block[i] = numeric.iloc[:, j].to_numpy(dtype="float64", na_value=np.nan)
+    return block
+
+
+def _exact_stats(numeric, percentiles):
+    """
+    Statistics from one float64 copy of the numeric columns. Columns are laid out grouped
+    by their number of values, so each group is a contiguous slice partitioned in place.
+    """
+    n_rows = numeric.shape[0]
+    order = np.argsort(numeric.count().to_numpy(), kind="stable")
+    block = _float_block(numeric, order)
+    n_cols = len(order)
+    count = np.empty(n_cols, dtype=np.int64)
+    mean = np.full(n_cols, np.nan)
+    std = np.full(n_cols, np.nan)
+    minimum = np.full(n_cols, np.nan)
+    maximum = np.full(n_cols, np.nan)
+    quantiles = {q: np.full(n_cols, np.nan) for q in percentiles}
+    for i in range(n_cols):
+        row = block[i]
+        missing = np.isnan(row)
+        count[i] = n_rows - missing.sum()
+        if count[i]:
+            mean[i] = np.nansum(row) / count[i]
+        if count[i] < n_rows:
+            # Missing values sort after every real value, so the first `count` items are the data.
+            row[missing] = np.inf
+
+    values, starts, sizes = np.unique(count, return_index=True, return_counts=True)
+    for c, start, size in zip(values.tolist(), starts.tolist(), sizes.tolist()):
+        if c == 0:
+            continue
+        rows = slice(start, start + size)
+        part = block[rows]
+        positions = {q: (c - 1) * q for q in percentiles}
+        kth = sorted({0, c - 1} | {int(np.floor(p)) for p in positions.values()}
+                     | {int(np.ceil(p)) for p in positions.values()})
+        part.partition(kth, axis=1)
+        minimum[rows] = part[:, 0]
+        maximum[rows] = part[:, c - 1]
+        for q, pos in positions.items():
+            lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+            quantiles[q][rows] = part[:, lo] + (part[:, hi] - part[:, lo]) * (pos - lo)
+        if c > 1:
+            # Centered sum of squares in column blocks so the deviations never need a full copy.
+            ss = np.zeros(size)
+            for lo in range(0, c, STD_BLOCK_ROWS):
+                dev = part[:, lo:min(lo + STD_BLOCK_ROWS, c)] - mean[rows, None]
+                ss += np.einsum("ij,ij->i", dev, dev)
+            std[rows] = np.sqrt(ss / (c - 1))
+
+    # Back to the frame's column order.
+    inverse = np.argsort(order)
+    return (count[inverse], mean[inverse], std[inverse], minimum[inverse], maximum[inverse],
+            {q: v[inverse] for q, v in quantiles.items()})
+
+
+@memoize()
+def compute_summary(data, percentiles=DEFAULT_PERCENTILES, approximate=False):
+    """
+    Summary statistics of every numeric column from one float64 block: moments and
+    all quantiles come out of a single partition per column group instead of one
+    pass per statistic. approximate=True takes quantiles from KLL sketches instead.
+    Timedelta columns are left out. Returns None when data has no numeric columns.
+    Memoized per dataset.
+    """
+    percentiles = tuple(sorted(set(percentiles) | {0.5}))
+    numeric = data.select_dtypes(include="number", exclude="timedelta")
+    if numeric.shape[1] == 0:
+        return None
+    if approximate:
+        from src.sketch import build_sketches
+        sketches = build_sketches(numeric, k=CONFIG["SKETCH_K"])
+        cols = numeric.columns
+        return SummaryStats(
+            cols,
+            np.array([sketches[c].count for c in cols]),
+            np.array([sketches[c].mean if sketches[c].count else np.nan for c in cols]),
+            np.array([sketches[c].std for c in cols]),
+            np.array([sketches[c].min if sketches[c].count else np.nan for c in cols]),
+            np.array([sketches[c].max if sketches[c].count else np.nan for c in cols]),
+            {q: np.array([sketches[c].quantile(q) for c in cols]) for q in percentiles},
+            exact=False,
+        )
+    count, mean, std, minimum, maximum, quantiles = _exact_stats(numeric, percentiles)
+    return SummaryStats(numeric.columns, count, mean, std, minimum, maximum, quantiles)
+
+
+def summary_table(data, percentiles=DEFAULT_PERCENTILES, approximate=False):
+    """
+    describe()-style table from the summary engine. Frames without numeric columns, or
+    with datetime/timedelta columns (which describe() reports as well), use describe().
+    """
+    if len(data.select_dtypes(include=["datetime", "datetimetz", "timedelta"]).columns):
+        return data.describe(percentiles=list(percentiles))
+    stats = compute_summary(data, percentiles=tuple(percentiles), approximate=approximate)
+    if stats is None:
+        return data.describe()
+    return stats.describe(percentiles)
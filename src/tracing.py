@@ -0,0 +1,219 @@
+#%% IMPORTS
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+from src.output_io import atomic_open
+
+_NULL_SECTION = nullcontext()
+
+
+class _MemoryTracing:
+    """
+    Reference-counted tracemalloc start/stop shared by every tracer in the process, so
+    one tracer turning memory tracking off does not stop it under another.
+    """
+
+    def __init__(self):
+        self.users = 0
+        self.started = False
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self.users += 1
+            if self.users == 1 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started = True
+
+    def release(self):
+        with self._lock:
+            self.users -= 1
+            if self.users == 0 and self.started:
+                tracemalloc.stop()
+                self.started = False
+
+
+_MEMORY = _MemoryTracing()
+
+
+class Tracer:
+    """
+    Records wall time, CPU time and (optionally) peak traced allocation per section.
+    Disabled by default; a disabled tracer costs one attribute check per call.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self._memory_hold = None
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self, memory=False):
+        self.enabled = True
+        self._track_memory(memory)
+
+    def disable(self):
+        self.enabled = False
+        self._track_memory(False)
+
+    def _track_memory(self, memory):
+        if memory and self._memory_hold is None:
+            _MEMORY.acquire()
+            # Released with the tracer too, e.g. when a session's tracer is collected.
+            self._memory_hold = weakref.finalize(self, _MEMORY.release)
+        elif not memory and self._memory_hold is not None:
+            self._memory_hold()
+            self._memory_hold = None
+        self.memory = memory
+
+    def reset(self):
+        """Drop recorded events (e.g. at the start of an app rerun)."""
+        with self._lock:
+            self.events = []
+
+    def drain(self):
+        """Return and clear the recorded events."""
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+    def extend(self, events):
+        """Add events recorded elsewhere, e.g. returned from a worker process."""
+        with self._lock:
+            self.events.extend(events)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def _record(self, name, category):
+        stack = self._stack()
+        frame = {"peak_seen": 0, "start_mem": 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["peak_seen"] = max(stack[-1]["peak_seen"], peak)
+            tracemalloc.reset_peak()
+            frame["start_mem"] = current
+        stack.append(frame)
+        start_ns = time.perf_counter_ns()
+        start_cpu = time.thread_time_ns()
+        try:
+            yield
+        finally:
+            wall_ns = time.perf_counter_ns() - start_ns
+            cpu_ns = time.thread_time_ns() - start_cpu
+            stack.pop()
+            peak_bytes = None
+            if self.memory:
+                peak = max(frame["peak_seen"], tracemalloc.get_traced_memory()[1])
+                peak_bytes = peak - frame["start_mem"]
+                if stack:
+                    stack[-1]["peak_seen"] = max(stack[-1]["peak_seen"], peak)
+            event = {
+                "name": name,
+                "cat": category,
+                "start_us": (start_ns - self._origin_ns) / 1000,
+                "wall_ms": wall_ns / 1e6,
+                "cpu_ms": cpu_ns / 1e6,
+                "peak_kb": None if peak_bytes is None else peak_bytes / 1024,
+                "depth": len(stack),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def section(self, name, category="section"):
+        """Context manager timing the enclosed block."""
+        if not self.enabled:
+            return _NULL_SECTION
+        return self._record(name, category)
+
+    def summary(self):
+        """Per-section totals: calls, wall/CPU time and the largest peak allocation."""
+        columns = ["name", "calls", "wall_ms", "cpu_ms", "peak_kb"]
+        with self._lock:
+            events = list(self.events)
+        if not events:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(events)
+        table = df.groupby("name", sort=False).agg(
+            calls=("wall_ms", "size"), wall_ms=("wall_ms", "sum"),
+            cpu_ms=("cpu_ms", "sum"), peak_kb=("peak_kb", "max"),
+        ).reset_index()
+        return table.sort_values("wall_ms", ascending=False)[columns].round(3).reset_index(drop=True)
+
+    def chrome_trace(self):
+        """Events in Chrome trace-event format (load in chrome://tracing or Perfetto)."""
+        with self._lock:
+            events = list(self.events)
+        trace = []
+        for e in events:
+            args = {"cpu_ms": round(e["cpu_ms"], 3)}
+            if e["peak_kb"] is not None:
+                args["peak_kb"] = round(e["peak_kb"], 1)
+            trace.append({"name": e["name"], "cat": e["cat"], "ph": "X", "ts": e["start_us"],
+                          "dur": e["wall_ms"] * 1000, "pid": e["pid"], "tid": e["tid"], "args": args})
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path):
+        with atomic_open(path) as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def _after_fork(self):
+        # A forked worker reports only its own events back to the parent.
+        self._lock = threading.Lock()
+        self.events = []
+
+
+# Process-wide tracer used by the decorators below unless a context activates its own.
+TRACER = Tracer()
+os.register_at_fork(after_in_child=TRACER._after_fork)
+
+_ACTIVE = contextvars.ContextVar("tracer", default=None)
+
+
+def current_tracer():
+    """The tracer activated in this context (e.g. an app session's), else TRACER."""
+    return _ACTIVE.get() or TRACER
+
+
+def activate(tracer):
+    """Route section() and @traced in the current context (thread) to tracer."""
+    _ACTIVE.set(tracer)
+
+
+def section(name, category="section"):
+    return current_tracer().section(name, category)
+
+
+def traced(name=None, category="call"):
+    """Decorator recording each call of the function as a trace section."""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = current_tracer()
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer._record(label, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,16 @@
+import pytest
+
+from src.benchmark import measure_import
+
+# Headless entry points import little beyond pandas; compare against a bare
+# `import pandas` on the same machine rather than an absolute time.
+PANDAS_RATIO = 1.5
+
+
+@pytest.mark.parametrize("module", ["src.cli_runner", "src.batch_runner"])
+def test_headless_import_skips_plotting_stack(module):
+    seconds, loaded = measure_import(module)
+    assert "matplotlib" not in loaded
+    assert "seaborn" not in loaded
+    pandas_seconds, _ = measure_import("pandas")
+    assert seconds <= PANDAS_RATIO * pandas_seconds
@@ -0,0 +1,45 @@
+import numpy as np
+
+from src.kde import binned_kde, exact_kde, kde_accuracy, scott_bandwidth
+
+# The binned KDE must stay within these of the exact KDE (density units / fraction of peak).
+MAX_REL_ERROR = 1e-3
+MAX_L1_ERROR = 1e-3
+
+
+def test_binned_kde_matches_exact_on_normal():
+    values = np.random.default_rng(0).normal(size=5000)
+    accuracy = kde_accuracy(values)
+    assert accuracy["max_rel_error"] < MAX_REL_ERROR
+    assert accuracy["l1_error"] < MAX_L1_ERROR
+
+
+def test_binned_kde_matches_exact_on_bimodal():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(-3, 1, 3000), rng.normal(4, 0.5, 2000)])
+    accuracy = kde_accuracy(values)
+    assert accuracy["max_rel_error"] < MAX_REL_ERROR
+    assert accuracy["l1_error"] < MAX_L1_ERROR
+
+
+def test_binned_kde_matches_exact_with_weights():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=3000)
+    weights = rng.random(3000)
+    accuracy = kde_accuracy(values, weights=weights)
+    assert accuracy["max_rel_error"] < MAX_REL_ERROR
+    assert accuracy["l1_error"] < MAX_L1_ERROR
+
+
+def test_exact_kde_is_a_density():
+    values = np.random.default_rng(3).normal(size=2000)
+    bw = scott_bandwidth(values)
+    grid = np.linspace(-8, 8, 4001)
+    density = exact_kde(values, grid, bw)
+    area = np.sum(0.5 * (density[1:] + density[:-1]) * np.diff(grid))
+    assert abs(area - 1.0) < 1e-6
+
+
+def test_binned_kde_constant_values():
+    grid, density = binned_kde(np.full(10, 2.0))
+    assert np.all(density == 0)